@@ -1,13 +1,16 @@
 # src/app.py
 
 import streamlit as st
-import plotly.graph_objects as go
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 import pandas as pd
-from services.database.mongodb import MongoDBService
-from services.analytics.treemap_serivce import TreemapService
-from services.cache.department_cache import get_departments, get_department_stats
+from services.database.mongodb import get_mongo_service
+from services.cache.cache_manager import CacheManager
+from services.cache.department_cache import get_departments, get_all_department_stats, get_department_labels
 from state.session import SessionState
 import logging
+import heapq
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor
 
 st.set_page_config(
     page_title="Bid Lens AI",  # Browser tab title
@@ -22,15 +25,95 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Treemap settings per view type; customdata columns are referenced by
+# position in the hover templates
+TREEMAP_VIEWS = {
+    "Project Count": {
+        "value_col": "count",
+        "custom_cols": ["total_value_millions", "unique_companies"],
+        "hover_data": {
+            'department': '%{label}',
+            'count': 'Projects: %{value:,}',
+            'total_value_millions': 'Value: ฿%{customdata[0]:.1f}M',
+            'unique_companies': 'Companies: %{customdata[1]:,}'
+        }
+    },
+    "Total Value": {
+        "value_col": "total_value_millions",
+        "custom_cols": ["count", "unique_companies"],
+        "hover_data": {
+            'department': '%{label}',
+            'total_value_millions': 'Value: ฿%{value:.1f}M',
+            'count': 'Projects: %{customdata[0]:,}',
+            'unique_companies': 'Companies: %{customdata[1]:,}'
+        }
+    }
+}
+
+@st.cache_data(show_spinner=False)
+def build_treemap(
+    data: pd.DataFrame,
+    id_col: str,
+    view_type: str,
+    title: str,
+    height: int,
+    layout_options: dict = None
+) -> dict:
+    """
+    Build (and memoize) a distribution treemap for the given view type
+    
+    The figure is cached as a plain dict: unpickling a go.Figure on every
+    cache hit re-validates the whole figure before st.plotly_chart does.
+    """
+    # Plotly and the treemap service are only needed on a cache miss
+    import numpy as np
+    from services.analytics.treemap_serivce import TreemapService
+    
+    view = TREEMAP_VIEWS[view_type]
+    custom_data = np.column_stack([data[col].to_numpy() for col in view["custom_cols"]])
+    
+    fig = TreemapService.create_treemap(
+        data=data,
+        id_col=id_col,
+        value_col=view["value_col"],
+        hover_data=view["hover_data"],
+        custom_data=custom_data,
+        title=title,
+        height=height,
+        color_scheme='Reds',
+        show_percentages=True,
+        layout_options=layout_options,
+        text_template="<b>%{label}</b><br>%{text:.1f}%"  # Label and percentage
+    )
+    return fig.to_dict()
+
 def handle_filter_change(new_filters):
     """Handle filter changes and redirect to home"""
     st.session_state.current_page = 'home'
 
-def process_department_data(collection):
-    """Process department distribution data from MongoDB collection"""
+@st.cache_data(ttl=300, show_spinner=False)
+def load_department_overview() -> dict:
+    """
+    Totals document and every department summary from department_distribution
+    
+    A file snapshot (refreshed hourly) serves cold starts and new processes,
+    so MongoDB is only queried once per hour rather than once per process.
+    """
+    cache = CacheManager()
+    overview = cache.get("department_overview")
+    if overview is None:
+        overview = get_mongo_service().get_department_overview()
+        cache.set("department_overview", overview, ttl=3600)
+    return overview
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_subdepartment_data(dept_name: str) -> list:
+    """Top sub-department rollups for a department, shared across sessions"""
+    return get_mongo_service().get_subdepartment_data(dept_name, limit=30)
+
+def process_department_data(totals):
+    """Process the department distribution totals document"""
     try:
-        # Get totals document
-        totals = collection.find_one({"_id": "totals"})
         if not totals:
             raise ValueError("Totals document not found")
         
@@ -48,157 +131,164 @@ def process_department_data(collection):
         logger.error(f"Error processing department data: {e}")
         raise
 
+@st.fragment
+def department_analysis(departments: list, dept_options: list, subdept_cache: dict):
+    """
+    Department treemap section
+    
+    Runs as a fragment: the view radio only reruns this section (and the
+    details fragment nested in it), not the metrics and overview fetch above it.
+    """
+    try:
+        # Department Distribution Section
+        st.header("Department Distribution")
+        
+        view_type = st.radio(
+            "View by:",
+            ["Project Count", "Total Value"],
+            horizontal=True,
+            key="dept_view_type"
+        )
+        
+        # Keep the top 20 pre-aggregated departments for the selected view and
+        # only build a DataFrame from those rows
+        dept_df = pd.DataFrame(heapq.nlargest(
+            20, departments,
+            key=itemgetter("count" if view_type == "Project Count" else "total_value")
+        ))
+        
+        # Create department treemap based on view type
+        fig = build_treemap(
+            dept_df,
+            id_col='department',
+            view_type=view_type,
+            title="Department Distribution",
+            height=600,
+            layout_options={
+                "margin": dict(t=50, l=10, r=10, b=10),
+                "uniformtext": dict(minsize=11, mode='hide')
+            }
+        )
+        
+        st.plotly_chart(fig, use_container_width=True)
+        
+        department_details(view_type, dept_options, subdept_cache)
+        
+    except Exception as e:
+        logger.error(f"Error in department analysis: {e}")
+        st.error("An unexpected error occurred. Please try again later.")
+
+@st.fragment
+def department_details(view_type: str, dept_options: list, subdept_cache: dict):
+    """
+    Department details section
+    
+    Nested fragment: picking another department only reruns the metrics and
+    sub-department treemap, not the department treemap above it.
+    """
+    try:
+        # Department Details Section
+        st.header("Department Details")
+        
+        # Get department stats and preformatted labels from cache
+        all_dept_stats = get_all_department_stats()
+        dept_labels = get_department_labels()
+        
+        # Options are department names; labels show stats where available
+        selected_dept = st.selectbox(
+            "Select Department for Detailed Analysis",
+            options=dept_options,
+            format_func=lambda dept: dept_labels.get(dept, dept),
+            key="dept_detail_select"
+        )
+        
+        if selected_dept:
+            dept_stats = all_dept_stats.get(selected_dept)
+            
+            if dept_stats:
+                # Display department metrics
+                col1, col2, col3, col4 = st.columns(4)
+                with col1:
+                    st.metric("Total Projects", f"{dept_stats['count']:,}")
+                with col2:
+                    st.metric("Total Value", f"฿{dept_stats['total_value_millions']:.2f}M")
+                with col3:
+                    st.metric("Market Share", f"{dept_stats['value_percentage']:.1f}%")
+                with col4:
+                    st.metric("Unique Companies", f"{dept_stats['unique_companies']:,}")
+                
+                # Get pre-aggregated subdepartment data with limit (only
+                # looked up for departments not seen in this session)
+                if selected_dept not in subdept_cache:
+                    subdept_cache[selected_dept] = load_subdepartment_data(selected_dept)
+                subdept_df = pd.DataFrame(subdept_cache[selected_dept])
+
+                # Create subdepartment treemap
+                subdept_fig = build_treemap(
+                    subdept_df,
+                    id_col='subdepartment',
+                    view_type=view_type,
+                    title=f"Sub-departments of {selected_dept}",
+                    height=400
+                )
+                
+                st.plotly_chart(subdept_fig, use_container_width=True)
+
+    except Exception as e:
+        logger.error(f"Error in department details: {e}")
+        st.error("An unexpected error occurred. Please try again later.")
+
 def main():
     """Department and sub-department analysis page using aggregated data"""
     try:
-        mongo_service = MongoDBService()
-        
         # Initialize session state
         SessionState.initialize_state()
         
-        try:
-            # Get metadata
-            collection = mongo_service.get_collection("department_distribution")
-            data = process_department_data(collection)
-            
-            if not data:
-                st.warning("No department data available for analysis")
-                return
-            
-            metadata = data["metadata"]
-            
-            # Display metrics
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.metric("Total Projects", f"{metadata['total_projects']:,}")
-            with col2:
-                st.metric("Total Value", f"฿{metadata['total_value']/1e6:,.2f}M")
-            with col3:
-                avg_value = metadata['total_value'] / metadata['total_projects']
-                st.metric("Average Project Value", f"฿{avg_value/1e6:,.2f}M")
-
-            # Department Distribution Section
-            st.header("Department Distribution")
-            
-            view_type = st.radio(
-                "View by:",
-                ["Project Count", "Total Value"],
-                horizontal=True
-            )
+        # Sub-department rollups are kept per session; the department shown
+        # in the details section is fetched while the overview query runs
+        subdept_cache = st.session_state.setdefault("subdept_data", {})
+        dept_options = get_departments()
+        detail_dept = st.session_state.get("dept_detail_select") or next(iter(dept_options), None)
+        
+        # The worker runs cached Streamlit functions, so it gets this
+        # session's script context attached when it starts
+        with ThreadPoolExecutor(
+            max_workers=1,
+            initializer=add_script_run_ctx,
+            initargs=(None, get_script_run_ctx())
+        ) as executor:
+            subdept_future = None
+            if detail_dept and detail_dept not in subdept_cache:
+                subdept_future = executor.submit(load_subdepartment_data, detail_dept)
             
-            # Get pre-aggregated department data with limit
-            dept_data = mongo_service.get_department_summary(
-                view_by="count" if view_type == "Project Count" else "total_value",
-                limit=20 #Show top 20 departments
-            )
+            # Both rankings come from the same cached summary, so toggling
+            # the view does not query MongoDB again
+            overview = load_department_overview()
             
-            # Convert to DataFrame
-            dept_df = pd.DataFrame(dept_data)
+            if subdept_future is not None:
+                subdept_cache[detail_dept] = subdept_future.result()
+        
+        # Get metadata
+        data = process_department_data(overview["totals"])
+        
+        if not data:
+            st.warning("No department data available for analysis")
+            return
+        
+        metadata = data["metadata"]
+        
+        # Display metrics
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Total Projects", f"{metadata['total_projects']:,}")
+        with col2:
+            st.metric("Total Value", f"฿{metadata['total_value']/1e6:,.2f}M")
+        with col3:
+            avg_value = metadata['total_value'] / metadata['total_projects']
+            st.metric("Average Project Value", f"฿{avg_value/1e6:,.2f}M")
 
-            
-            # Create treemap based on view type
-            if view_type == "Project Count":
-                value_col = 'count'
-                hover_data = {
-                    'department': '%{label}',
-                    'count': 'Projects: %{value:,}',
-                    'total_value_millions': 'Value: ฿%{customdata.total_value_millions:.1f}M',
-                    'unique_companies': 'Companies: %{customdata.unique_companies:,}'
-                }
-                custom_data = dept_df[['total_value_millions', 'unique_companies']].to_dict('records')
-            else:
-                value_col = 'total_value_millions'
-                hover_data = {
-                    'department': '%{label}',
-                    'total_value_millions': 'Value: ฿%{value:.1f}M',
-                    'count': 'Projects: %{customdata.count:,}',
-                    'unique_companies': 'Companies: %{customdata.unique_companies:,}'
-                }
-                custom_data = dept_df[['count', 'unique_companies']].to_dict('records')
-
-            # Create department treemap
-            fig = TreemapService.create_treemap(
-                data=dept_df,
-                id_col='department',
-                value_col=value_col,
-                hover_data=hover_data,
-                custom_data=custom_data,
-                title="Department Distribution",
-                height=600,
-                color_scheme='Reds',
-                show_percentages=True,
-                layout_options={
-                    "margin": dict(t=50, l=10, r=10, b=10),
-                    "uniformtext": dict(minsize=11, mode='hide')
-                },
-                text_template="<b>{}</b><br>{:.1f}%"  # Format for label and percentage
-            )
-            
-            st.plotly_chart(fig, use_container_width=True)
-            
-            # Department Details Section
-            st.header("Department Details")
-            
-            # Get departments from cache
-            dept_options = get_departments()
-            
-            # Format department options to show stats
-            dept_display_options = []
-            for dept in dept_options:
-                stats = get_department_stats(dept)
-                if stats:
-                    count = stats.get('count', 0)
-                    value = stats.get('total_value_millions', 0)
-                    dept_display_options.append(f"{dept} ({count:,} projects, ฿{value:.1f}M)")
-                else:
-                    dept_display_options.append(dept)
-            
-            # Create mapping from display string back to department name
-            dept_mapping = dict(zip(dept_display_options, dept_options))
-            
-            selected_display = st.selectbox(
-                "Select Department for Detailed Analysis",
-                options=dept_display_options
-            )
-            
-            if selected_display:
-                selected_dept = dept_mapping[selected_display]
-                dept_stats = get_department_stats(selected_dept)
-                
-                if dept_stats:
-                    # Display department metrics
-                    col1, col2, col3, col4 = st.columns(4)
-                    with col1:
-                        st.metric("Total Projects", f"{dept_stats['count']:,}")
-                    with col2:
-                        st.metric("Total Value", f"฿{dept_stats['total_value_millions']:.2f}M")
-                    with col3:
-                        st.metric("Market Share", f"{dept_stats['value_percentage']:.1f}%")
-                    with col4:
-                        st.metric("Unique Companies", f"{dept_stats['unique_companies']:,}")
-                    
-                    # Get pre-aggregated subdepartment data with limit
-                    subdept_data = mongo_service.get_subdepartment_data(selected_dept, limit=30)
-                    subdept_df = pd.DataFrame(subdept_data)
-
-                    # Create subdepartment treemap
-                    subdept_fig = TreemapService.create_treemap(
-                        data=subdept_df,
-                        id_col='subdepartment',
-                        value_col=value_col,
-                        hover_data=hover_data,
-                        custom_data=custom_data,
-                        title=f"Sub-departments of {selected_dept}",
-                        height=400,
-                        color_scheme='Reds',
-                        show_percentages=True,
-                        text_template="<b>{}</b><br>{:.1f}%"
-                    )
-                    
-                    st.plotly_chart(subdept_fig, use_container_width=True)
-
-        finally:
-            mongo_service.disconnect()
+        # Treemap and details rerun on their own when their widgets change
+        department_analysis(overview["departments"], dept_options, subdept_cache)
 
     except Exception as e:
         logger.error(f"Error in application: {e}")
@@ -2,8 +2,22 @@
 
 import streamlit as st
 from typing import List, Tuple, Dict
+from functools import lru_cache
 import re
 
+# Project fields matched by keyword search
+KEYWORD_FIELDS = ["project_name", "project_detail", "winner"]
+
+@lru_cache(maxsize=512)
+def _keyword_pattern(*keywords: str) -> re.Pattern:
+    """Case-insensitive pattern matching any of the keywords as a substring"""
+    # MongoDB $regex matches anywhere in the string, so no .* padding is needed
+    return re.compile("|".join(re.escape(keyword) for keyword in keywords), re.IGNORECASE)
+
+def _split_keywords(text: str) -> List[str]:
+    """Non-empty, stripped lines of a keyword text area"""
+    return [keyword for keyword in map(str.strip, text.splitlines()) if keyword]
+
 def KeywordFilter(
     current_include: List[str] = None,
     current_exclude: List[str] = None,
@@ -46,17 +60,8 @@ def KeywordFilter(
     )
     
     # Process inputs
-    include_keywords = [
-        keyword.strip() 
-        for keyword in include_input.split("\n") 
-        if keyword.strip()
-    ]
-    
-    exclude_keywords = [
-        keyword.strip() 
-        for keyword in exclude_input.split("\n") 
-        if keyword.strip()
-    ]
+    include_keywords = _split_keywords(include_input)
+    exclude_keywords = _split_keywords(exclude_input)
     
     return include_keywords, exclude_keywords
 
@@ -74,35 +79,19 @@ def build_keyword_query(include_keywords: List[str], exclude_keywords: List[str]
     query = {}
     conditions = []
     
-    # Build include conditions
-    if include_keywords:
-        for keyword in include_keywords:
-            pattern = re.compile(f".*{re.escape(keyword)}.*", re.IGNORECASE)
-            conditions.append({
-                "$or": [
-                    {"project_name": pattern},
-                    {"project_detail": pattern},
-                    {"winner": pattern}
-                ]
-            })
+    # Build include conditions (every keyword must match in some field)
+    for keyword in include_keywords:
+        pattern = _keyword_pattern(keyword)
+        conditions.append({
+            "$or": [{field: pattern} for field in KEYWORD_FIELDS]
+        })
     
-    # Build exclude conditions
+    # Build exclude condition: one alternation of all keywords, which must
+    # not match in any field
     if exclude_keywords:
-        exclude_patterns = [
-            re.compile(f".*{re.escape(keyword)}.*", re.IGNORECASE)
-            for keyword in exclude_keywords
-        ]
+        pattern = _keyword_pattern(*exclude_keywords)
         conditions.append({
-            "$nor": [
-                {
-                    "$or": [
-                        {"project_name": pattern},
-                        {"project_detail": pattern},
-                        {"winner": pattern}
-                    ]
-                }
-                for pattern in exclude_patterns
-            ]
+            "$nor": [{field: pattern} for field in KEYWORD_FIELDS]
         })
     
     # Combine conditions
@@ -53,9 +53,118 @@ class TableFilter:
         config.update(user_config)
         return config
     
-    def _format_display_option(self, name: str, count: int) -> str:
-        """Format display option with count"""
-        return f"{name} ({count:,} projects)"
+    def _df_cache(self) -> Dict[str, Any]:
+        """
+        Per-DataFrame cache for derived filter data, kept in session state
+        
+        Pages pass the same results DataFrame on every rerun, so anything
+        derived from it only needs computing once. The cache holds a reference
+        to the DataFrame and is reset whenever a different one is passed.
+        """
+        cache_key = f"{self.key_prefix}filter_cache"
+        cache = st.session_state.get(cache_key)
+        if cache is None or cache['df'] is not self.df:
+            cache = st.session_state[cache_key] = {'df': self.df}
+        return cache
+    
+    def _value_counts(self, column: str) -> pd.Series:
+        """Value counts of a column, computed once per DataFrame"""
+        counts = self._df_cache().setdefault('value_counts', {})
+        if column not in counts:
+            column_counts = self._categorical_df()[column].value_counts(dropna=True)
+            counts[column] = column_counts[column_counts > 0]
+        return counts[column]
+    
+    def _column_range(self, column: str) -> Tuple[Any, Any]:
+        """Minimum and maximum of a column, computed once per DataFrame"""
+        ranges = self._df_cache().setdefault('ranges', {})
+        if column not in ranges:
+            ranges[column] = (self.df[column].min(), self.df[column].max())
+        return ranges[column]
+    
+    def _sorted_values(self, column: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Sorted float64 values of a column and the row order that sorts them
+        
+        Computed once per DataFrame; missing values sort last, so they are
+        never inside a searchsorted range.
+        """
+        sorted_values = self._df_cache().setdefault('sorted_values', {})
+        if column not in sorted_values:
+            values = self.df[column].to_numpy(dtype=float, na_value=np.nan)
+            order = np.argsort(values, kind='stable')
+            sorted_values[column] = (values[order], order)
+        return sorted_values[column]
+    
+    def _date_values(self, column: str) -> np.ndarray:
+        """Datetime column as int64 epoch nanoseconds, converted once per DataFrame"""
+        arrays = self._df_cache().setdefault('date_values', {})
+        if column not in arrays:
+            # NaT views as the minimum int64, so it fails every lower bound
+            arrays[column] = self.df[column].to_numpy(dtype='datetime64[ns]').view('i8')
+        return arrays[column]
+    
+    def _isin_mask(self, column: str, selected: List[Any]) -> np.ndarray:
+        """
+        Row mask for a multiselect filter over the categorical frame
+        
+        The latest mask per column is kept, so changing one filter does not
+        recompute the isin of every other active filter.
+        """
+        masks = self._df_cache().setdefault('isin_masks', {})
+        selection = frozenset(selected)
+        cached = masks.get(column)
+        if cached is None or cached[0] != selection:
+            # Look the category codes up in a per-category table instead of
+            # hashing every row; the extra last slot is what code -1 (missing)
+            # indexes, and stays False
+            values = self._categorical_df()[column].cat
+            selected_codes = values.categories.get_indexer(list(selection))
+            is_selected = np.zeros(len(values.categories) + 1, dtype=bool)
+            is_selected[selected_codes[selected_codes >= 0]] = True
+            cached = masks[column] = (selection, is_selected[values.codes.to_numpy()])
+        return cached[1]
+    
+    def _categorical_columns(self) -> List[str]:
+        """Configured string filter columns present in the DataFrame"""
+        return [
+            self.config[key] for key in (
+                'company_column',
+                'department_column',
+                'subdepartment_column',
+                'project_type_column',
+                'procurement_method_column'
+            )
+            if self.config[key] in self.df.columns
+        ]
+    
+    def _categorical_df(self) -> pd.DataFrame:
+        """
+        Copy of the DataFrame with the string filter columns as categoricals
+        
+        Built once per DataFrame; isin and value_counts then run on integer
+        codes instead of hashing Python strings row by row.
+        """
+        cache = self._df_cache()
+        if 'categorical_df' not in cache:
+            cache['categorical_df'] = self.df.astype(
+                {column: 'category' for column in self._categorical_columns()}
+            )
+        return cache['categorical_df']
+    
+    @staticmethod
+    def _display_labels(counts: pd.Series) -> Dict[Any, str]:
+        """Display label per value for value counts, in count order"""
+        names = counts.index.tolist()
+        labels = [f"{name} ({count:,} projects)" for name, count in zip(names, counts.tolist())]
+        return dict(zip(names, labels))
+    
+    def _column_labels(self, column: str) -> Dict[Any, str]:
+        """Display labels for a whole column, built once per DataFrame"""
+        labels = self._df_cache().setdefault('labels', {})
+        if column not in labels:
+            labels[column] = self._display_labels(self._value_counts(column))
+        return labels[column]
     
     def _add_value_filter(self, col) -> Optional[Tuple[float, float]]:
         """Add value range filter"""
@@ -66,8 +175,9 @@ class TableFilter:
         if value_col not in self.df.columns:
             return None
             
-        min_value = float(self.df[value_col].min()) / self.config['value_unit']
-        max_value = float(self.df[value_col].max()) / self.config['value_unit'] + 0.01
+        column_min, column_max = self._column_range(value_col)
+        min_value = float(column_min) / self.config['value_unit']
+        max_value = float(column_max) / self.config['value_unit'] + 0.01
         
         col.markdown(f"**Value Range ({self.config['value_label']})**")
         value_range = col.slider(
@@ -89,8 +199,7 @@ class TableFilter:
         if date_col not in self.df.columns:
             return None
             
-        min_date = self.df[date_col].min()
-        max_date = self.df[date_col].max()
+        min_date, max_date = self._column_range(date_col)
         
         # Calculate default dates
         default_start = max(min_date, max_date - pd.DateOffset(years=3))
@@ -141,21 +250,16 @@ class TableFilter:
         if company_col not in self.df.columns:
             return None
         
-        # Get company counts and sort by frequency
-        company_counts = self.df[company_col].value_counts()
-        company_options = {
-            self._format_display_option(company, count): company
-            for company, count in company_counts.items()
-        }
+        # Company options sorted by frequency, shown with their counts
+        company_labels = self._column_labels(company_col)
         
         col.markdown("**Company Filter**")
-        selected_labels = col.multiselect(
+        return col.multiselect(
             "Select Companies",
-            options=list(company_options.keys()),
+            options=list(company_labels),
+            format_func=company_labels.__getitem__,
             key=f"{self.key_prefix}companies"
         )
-        
-        return [company_options[label] for label in selected_labels]
     
     def _add_department_filters(self, col) -> Tuple[Optional[List[str]], Optional[List[str]]]:
         """Add department and sub-department filters"""
@@ -169,40 +273,40 @@ class TableFilter:
             return None, None
         
         # Department filter
-        dept_counts = self.df[dept_col].value_counts()
-        dept_options = {
-            self._format_display_option(dept, count): dept
-            for dept, count in dept_counts.items()
-        }
+        dept_labels = self._column_labels(dept_col)
         
         col.markdown("**Department Filters**")
-        selected_dept_labels = col.multiselect(
+        selected_depts = col.multiselect(
             "Select Departments",
-            options=list(dept_options.keys()),
+            options=list(dept_labels),
+            format_func=dept_labels.__getitem__,
             key=f"{self.key_prefix}departments"
         )
         
-        selected_depts = [dept_options[label] for label in selected_dept_labels]
-        
         # Sub-department filter (only if departments are selected)
+        if not selected_depts or subdept_col not in self.df.columns:
+            return selected_depts, []
+        
+        # Sub-department labels are kept per department selection, so reruns
+        # that leave the departments unchanged skip the isin and value_counts
+        subdept_labels_cache = self._df_cache().setdefault('subdept_labels', {})
+        selection = frozenset(selected_depts)
+        if selection not in subdept_labels_cache:
+            categorical_df = self._categorical_df()
+            subdept_df = categorical_df[categorical_df[dept_col].isin(selected_depts)]
+            subdept_counts = subdept_df[subdept_col].value_counts(dropna=True)
+            subdept_counts = subdept_counts[subdept_counts > 0]  # Categories outside the selection
+            subdept_labels_cache[selection] = self._display_labels(subdept_counts)
+        subdept_labels = subdept_labels_cache[selection]
+        
         selected_subdepts = []
-        if selected_depts:
-            subdept_df = self.df[self.df[dept_col].isin(selected_depts)]
-            subdept_counts = subdept_df[subdept_col].value_counts()
-            
-            subdept_options = {
-                self._format_display_option(subdept, count): subdept
-                for subdept, count in subdept_counts.items()
-                if pd.notna(subdept)
-            }
-            
-            if subdept_options:
-                selected_subdept_labels = col.multiselect(
-                    "Select Sub-departments",
-                    options=list(subdept_options.keys()),
-                    key=f"{self.key_prefix}subdepartments"
-                )
-                selected_subdepts = [subdept_options[label] for label in selected_subdept_labels]
+        if subdept_labels:
+            selected_subdepts = col.multiselect(
+                "Select Sub-departments",
+                options=list(subdept_labels),
+                format_func=subdept_labels.__getitem__,
+                key=f"{self.key_prefix}subdepartments"
+            )
         
         return selected_depts, selected_subdepts
     
@@ -215,22 +319,16 @@ class TableFilter:
         if type_col not in self.df.columns:
             return None
         
-        # Get type counts
-        type_counts = self.df[type_col].value_counts()
-        type_options = {
-            self._format_display_option(ptype, count): ptype
-            for ptype, count in type_counts.items()
-            if pd.notna(ptype)
-        }
+        # Project type options with their counts
+        type_labels = self._column_labels(type_col)
         
         col.markdown("**Project Type Filter**")
-        selected_labels = col.multiselect(
+        return col.multiselect(
             "Select Project Types",
-            options=list(type_options.keys()),
+            options=list(type_labels),
+            format_func=type_labels.__getitem__,
             key=f"{self.key_prefix}project_types"
         )
-        
-        return [type_options[label] for label in selected_labels]
     
     def _add_procurement_method_filter(self, col) -> Optional[List[str]]:
         """Add procurement method filter with default e-bidding selection"""
@@ -241,46 +339,45 @@ class TableFilter:
         if method_col not in self.df.columns:
             return None
         
-        # Get method counts
-        method_counts = self.df[method_col].value_counts()
-        method_options = {
-            self._format_display_option(method, count): method
-            for method, count in method_counts.items()
-            if pd.notna(method)
-        }
+        # Procurement method options with their counts
+        method_labels = self._column_labels(method_col)
+        method_options = list(method_labels)
         
         col.markdown("**Procurement Method Filter**")
         
-        # # Find e-bidding option if it exists
-        # ebidding_key = next(
-        #     (key for key in method_options.keys() 
-        #      if "e-bidding" in key.lower() or "ประกวดราคาอิเล็กทรอนิกส์" in key),
+        # # Find e-bidding option if it exists (options are method names)
+        # ebidding_method = next(
+        #     (method for method in method_options
+        #      if "e-bidding" in method.lower() or "ประกวดราคาอิเล็กทรอนิกส์" in method),
         #     None
         # )
         
         # # Set default selection
         # if f"{self.key_prefix}procurement_methods" not in st.session_state:
-        #     if ebidding_key:
-        #         st.session_state[f"{self.key_prefix}procurement_methods"] = [ebidding_key]
+        #     if ebidding_method:
+        #         st.session_state[f"{self.key_prefix}procurement_methods"] = [ebidding_method]
         #     elif method_options:
-        #         st.session_state[f"{self.key_prefix}procurement_methods"] = [list(method_options.keys())[0]]
+        #         st.session_state[f"{self.key_prefix}procurement_methods"] = method_options[:1]
         
-        selected_labels = col.multiselect(
+        return col.multiselect(
             "Select Procurement Methods",
-            options=list(method_options.keys()),
+            options=method_options,
+            format_func=method_labels.__getitem__,
             key=f"{self.key_prefix}procurement_methods"
         )
-        
-        return [method_options[label] for label in selected_labels]
     
     def filter_dataframe(self) -> pd.DataFrame:
         """Apply all filters to the DataFrame"""
         st.markdown("### 🎯 Refine Results")
         
         with st.expander("Advanced Filters", expanded=self.config['expander_default']):
-            filtered_df = self.df.copy()
+            base_df = self._categorical_df()
             active_filters = []
             
+            # Every active filter ANDs into one row mask over the full frame;
+            # rows are only selected once, after all filters are known
+            mask = np.ones(len(base_df), dtype=bool)
+            
             # Create three columns for filter layout
             col1, col2, col3 = st.columns(3)
             
@@ -288,12 +385,18 @@ class TableFilter:
                 # Value range filter
                 value_range = self._add_value_filter(col1)
                 if value_range:
-                    filtered_df = filtered_df[
-                        (filtered_df[self.config['value_column']] >= value_range[0] * self.config['value_unit']) &
-                        (filtered_df[self.config['value_column']] <= value_range[1] * self.config['value_unit'])
-                    ]
-                    min_val = float(self.df[self.config['value_column']].min()) / self.config['value_unit']
-                    max_val = float(self.df[self.config['value_column']].max()) / self.config['value_unit']
+                    # Binary-search the bounds in the sorted column; rows are
+                    # only masked out when some fall outside the range
+                    values, order = self._sorted_values(self.config['value_column'])
+                    lo = np.searchsorted(values, value_range[0] * self.config['value_unit'], side='left')
+                    hi = np.searchsorted(values, value_range[1] * self.config['value_unit'], side='right')
+                    if hi - lo < len(mask):
+                        in_range = np.zeros(len(mask), dtype=bool)
+                        in_range[order[lo:hi]] = True
+                        mask &= in_range
+                    column_min, column_max = self._column_range(self.config['value_column'])
+                    min_val = float(column_min) / self.config['value_unit']
+                    max_val = float(column_max) / self.config['value_unit']
                     if value_range != (min_val, max_val):
                         active_filters.append(
                             f"Value: {value_range[0]:.1f} - {value_range[1]:.1f} {self.config['value_label']}"
@@ -302,62 +405,58 @@ class TableFilter:
                 # Department filters
                 selected_depts, selected_subdepts = self._add_department_filters(col1)
                 if selected_depts:
-                    filtered_df = filtered_df[
-                        filtered_df[self.config['department_column']].isin(selected_depts)
-                    ]
+                    mask &= self._isin_mask(self.config['department_column'], selected_depts)
                     active_filters.append(f"Departments: {len(selected_depts)} selected")
                 
                 if selected_subdepts:
-                    filtered_df = filtered_df[
-                        filtered_df[self.config['subdepartment_column']].isin(selected_subdepts)
-                    ]
+                    mask &= self._isin_mask(self.config['subdepartment_column'], selected_subdepts)
                     active_filters.append(f"Sub-departments: {len(selected_subdepts)} selected")
             
             with col2:
                 # Project type filter
                 selected_types = self._add_project_type_filter(col2)
                 if selected_types:
-                    filtered_df = filtered_df[
-                        filtered_df[self.config['project_type_column']].isin(selected_types)
-                    ]
+                    mask &= self._isin_mask(self.config['project_type_column'], selected_types)
                     active_filters.append(f"Project Types: {len(selected_types)} selected")
                 
                 # Procurement method filter
                 selected_methods = self._add_procurement_method_filter(col2)
                 if selected_methods:
-                    filtered_df = filtered_df[
-                        filtered_df[self.config['procurement_method_column']].isin(selected_methods)
-                    ]
+                    mask &= self._isin_mask(self.config['procurement_method_column'], selected_methods)
                     active_filters.append(f"Procurement Methods: {len(selected_methods)} selected")
             
             with col3:
                 # Company filter
                 selected_companies = self._add_company_filter(col3)
                 if selected_companies:
-                    filtered_df = filtered_df[
-                        filtered_df[self.config['company_column']].isin(selected_companies)
-                    ]
+                    mask &= self._isin_mask(self.config['company_column'], selected_companies)
                     active_filters.append(f"Companies: {len(selected_companies)} selected")
                 
                 # Date range filter
                 date_range = self._add_date_filter(col3)
                 if date_range:
                     start_date, end_date = date_range
-                    filtered_df = filtered_df[
-                        (filtered_df[self.config['date_column']].dt.date >= start_date) &
-                        (filtered_df[self.config['date_column']].dt.date <= end_date)
-                    ]
-                    min_date = self.df[self.config['date_column']].min().date()
-                    max_date = self.df[self.config['date_column']].max().date()
+                    # Compare epoch nanoseconds against the day bounds (end
+                    # date inclusive) instead of building date objects
+                    dates = self._date_values(self.config['date_column'])
+                    mask &= dates >= pd.Timestamp(start_date).value
+                    mask &= dates < (pd.Timestamp(end_date) + pd.Timedelta(days=1)).value
+                    min_date, max_date = (
+                        bound.date() for bound in self._column_range(self.config['date_column'])
+                    )
                     if start_date != min_date or end_date != max_date:
                         active_filters.append(f"Date: {start_date} to {end_date}")
             
+            # Count kept rows on the mask; rows are only gathered when a
+            # filter actually drops some
+            kept_rows = np.count_nonzero(mask)
+            
             # Show filter summary and clear button
-            if len(filtered_df) != len(self.df):
+            if kept_rows != len(self.df):
                 col1, col2 = st.columns([3, 1])
                 
                 with col1:
-                    st.markdown(f"**Filtered {len(filtered_df):,} out of {len(self.df):,} projects**")
+                    st.markdown(f"**Filtered {kept_rows:,} out of {len(self.df):,} projects**")
                     if active_filters:
                         st.markdown("**Active Filters:** " + " | ".join(active_filters))
                 
@@ -365,12 +464,31 @@ class TableFilter:
                     if st.button("🔄 Clear Filters", 
                                key=f"{self.key_prefix}clear_filters",
                                use_container_width=True):
-                        # Reset all session state keys used by this filter instance
-                        for key in st.session_state:
-                            if key.startswith(self.key_prefix):
-                                del st.session_state[key]
+                        # Reset the widget keys used by this filter instance;
+                        # keys are snapshotted before deleting, and the derived
+                        # data cache is kept since the DataFrame is unchanged
+                        cache_key = f"{self.key_prefix}filter_cache"
+                        widget_keys = [
+                            key for key in st.session_state
+                            if key.startswith(self.key_prefix) and key != cache_key
+                        ]
+                        for key in widget_keys:
+                            del st.session_state[key]
                         st.rerun()
         
+        # Nothing filtered out: hand back a shallow copy of the input frame,
+        # so column writes by callers (e.g. PeriodAnalysisService adding
+        # date/period) stay off the stored results without copying any data
+        if kept_rows == len(self.df):
+            return self.df.copy(deep=False)
+        
+        # Gather only the kept rows by position, then hand back the filter
+        # columns with their original dtypes (take() returned a fresh frame,
+        # so only those columns are converted in place)
+        filtered_df = base_df.take(np.flatnonzero(mask))
+        for column in self._categorical_columns():
+            filtered_df[column] = filtered_df[column].astype(self.df[column].dtype)
+        
         return filtered_df
 
 
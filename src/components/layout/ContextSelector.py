@@ -12,6 +12,46 @@ def handle_duplicate_projects(df: pd.DataFrame) -> pd.DataFrame:
         return df.drop_duplicates(subset=['project_id'], keep='first')
     return df
 
+def add_to_context_df(new_df: pd.DataFrame):
+    """
+    Append a collection's projects to the context DataFrame
+    
+    The project ids already in context are kept in session state, so only
+    the new rows are checked and appended instead of re-deduplicating the
+    whole combined DataFrame on every addition. The id set holds a reference
+    to the context DataFrame it describes and is rebuilt whenever the
+    context was reset or replaced elsewhere.
+    """
+    context_df = st.session_state.context_df
+    
+    # Without project ids there is nothing to deduplicate on
+    if 'project_id' not in new_df.columns or (
+        context_df is not None and 'project_id' not in context_df.columns
+    ):
+        st.session_state.context_df = (
+            new_df if context_df is None
+            else pd.concat([context_df, new_df], ignore_index=True)
+        )
+        return
+    
+    cached_ids = st.session_state.get('context_ids')
+    if context_df is None:
+        context_ids = set()
+    elif cached_ids is None or cached_ids['df'] is not context_df:
+        context_ids = set(context_df['project_id'])
+    else:
+        context_ids = cached_ids['ids']
+    
+    fresh_df = handle_duplicate_projects(new_df[~new_df['project_id'].isin(context_ids)])
+    context_ids.update(fresh_df['project_id'])
+    
+    context_df = (
+        fresh_df if context_df is None
+        else pd.concat([context_df, fresh_df], ignore_index=True)
+    )
+    st.session_state.context_df = context_df
+    st.session_state.context_ids = {'df': context_df, 'ids': context_ids}
+
 def get_current_results() -> Optional[pd.DataFrame]:
     """Safely get current results from session state"""
     if 'filtered_results' in st.session_state:
@@ -40,12 +80,14 @@ def ContextSelector():
         
         # Display current context
         if st.session_state.context_df is not None:
+            # Count distinct project ids (no copy or drop_duplicates), since
+            # not every way into the context deduplicates its rows
             df = st.session_state.context_df
-            deduped_df = handle_duplicate_projects(df.copy())
+            project_count = df['project_id'].nunique() if 'project_id' in df.columns else len(df)
             
             st.markdown(f"""
             **Active Collections:** {len(st.session_state.context_collections)}  
-            **Projects:** {len(deduped_df):,}
+            **Projects:** {project_count:,}
             """)
             
             # Show collection names
@@ -57,6 +99,7 @@ def ContextSelector():
             if st.button("🔄 Reset Context", key="sidebar_reset_context"):
                 st.session_state.context_collections = []
                 st.session_state.context_df = None
+                st.session_state.pop('context_ids', None)
                 st.rerun()
         
         st.divider()
@@ -128,14 +171,7 @@ def ContextSelector():
                             if save_and_use:
                                 if collection_info['name'] not in [c['name'] for c in st.session_state.context_collections]:
                                     st.session_state.context_collections.append(collection_info)
-                                    if st.session_state.context_df is None:
-                                        st.session_state.context_df = current_results
-                                    else:
-                                        combined_df = pd.concat(
-                                            [st.session_state.context_df, current_results],
-                                            ignore_index=True
-                                        )
-                                        st.session_state.context_df = handle_duplicate_projects(combined_df)
+                                    add_to_context_df(current_results)
                                     st.success("Added to context!")
                                     st.rerun()
                         else:
@@ -178,16 +214,8 @@ def ContextSelector():
                         # Add to collections list
                         st.session_state.context_collections.append(collection)
                         
-                        # Update context DataFrame
-                        if st.session_state.context_df is None:
-                            st.session_state.context_df = new_df
-                        else:
-                            combined_df = pd.concat(
-                                [st.session_state.context_df, new_df],
-                                ignore_index=True
-                            )
-                            # Remove duplicates when combining
-                            st.session_state.context_df = handle_duplicate_projects(combined_df)
+                        # Update context DataFrame (duplicates are skipped)
+                        add_to_context_df(new_df)
                         
                         st.success(f"Added '{collection['name']}' to context")
                         st.rerun()
@@ -2,6 +2,7 @@
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.graph_objects as go
 from typing import Optional, Union, List
 import os
@@ -199,13 +200,18 @@ def MetricsSummary(df: Optional[pd.DataFrame] = None):
                 # First row of metrics
                 col1, col2, col3, col4, col5 = st.columns(5)
                 
+                # Single NaN-aware pass per column; the value sum is reused
+                # for the average and the price cut
+                values = df['sum_price_agree'].to_numpy(dtype=float)
+                valid_values = np.count_nonzero(~np.isnan(values))
+                
                 total_projects = len(df)
-                total_value = df['sum_price_agree'].sum()
-                avg_value = df['sum_price_agree'].mean()
+                total_value = np.nansum(values)
+                avg_value = total_value / valid_values if valid_values else float('nan')
                 unique_companies = df['winner'].nunique()
                 
                 # Calculate price cut percentage
-                avg_price_cut = (((df['sum_price_agree'].sum() / df['price_build'].sum()) - 1) * 100)
+                avg_price_cut = (((total_value / np.nansum(df['price_build'].to_numpy(dtype=float))) - 1) * 100)
                 
                 with col1:
                     st.metric(
@@ -5,6 +5,7 @@ import pandas as pd
 from datetime import datetime, timedelta
 from typing import Optional, List
 from services.database.collections_manager import save_collection
+from components.layout.ContextSelector import add_to_context_df
 
 def SaveCollection(
     df: pd.DataFrame,
@@ -104,15 +105,9 @@ def SaveCollection(
                         if 'context_df' not in st.session_state:
                             st.session_state.context_df = None
                             
-                        # Add to context
+                        # Add to context (duplicates are skipped)
                         st.session_state.context_collections.append(collection_info)
-                        if st.session_state.context_df is None:
-                            st.session_state.context_df = df
-                        else:
-                            st.session_state.context_df = pd.concat(
-                                [st.session_state.context_df, df],
-                                ignore_index=True
-                            )
+                        add_to_context_df(df)
                         st.success("Collection added to analysis context!")
                         return collection_info
                 else:
@@ -42,9 +42,11 @@ def ProjectsTable(
             ).lower()
             
             if search_term:
+                # Plain substring match: no regex compile, and characters such
+                # as '(' or '+' in company names are matched literally
                 display_df = display_df[
-                    display_df['project_name'].str.lower().str.contains(search_term) |
-                    display_df['winner'].str.lower().str.contains(search_term)
+                    display_df['project_name'].str.lower().str.contains(search_term, regex=False) |
+                    display_df['winner'].str.lower().str.contains(search_term, regex=False)
                 ]
         
         with col2:
@@ -81,17 +83,27 @@ def ProjectsTable(
     # Format dates and values for display
     display_df['transaction_date'] = pd.to_datetime(display_df['transaction_date']).dt.strftime('%Y-%m-%d')
     
+    # Slim the displayed columns before Arrow serialization: float32 for the
+    # price cut (a percentage rounded to 2 decimals, well within float32),
+    # category for the repeated company and department names. Values stay
+    # float64, as large contract values lose cents in float32
+    table_df = display_df[[
+        'transaction_date',
+        'project_id', 
+        'project_name', 
+        'winner', 
+        'sum_price_agree', 
+        'price_cut',
+        'dept_name'
+    ]].astype({
+        'price_cut': 'float32',
+        'winner': 'category',
+        'dept_name': 'category'
+    })
+    
     # Display the table with numerical sorting
     st.dataframe(
-        display_df[[
-            'transaction_date',
-            'project_id', 
-            'project_name', 
-            'winner', 
-            'sum_price_agree', 
-            'price_cut',
-            'dept_name'
-        ]],
+        table_df,
         column_config={
             "transaction_date": st.column_config.DateColumn(
                 "Date",
@@ -11,7 +11,7 @@ from components.tables.ProjectsTable import ProjectsTable
 from components.layout.SaveCollection import SaveCollection
 from components.layout.ContextSelector import ContextSelector
 from state.session import SessionState
-from services.database.mongodb import MongoDBService
+from services.database.mongodb import get_mongo_service
 from services.analytics.period_analysis import PeriodAnalysisService
 from services.analytics.company_projects import CompanyProjectsService
 from services.analytics.subdept_projects import display_subdepartment_distribution
@@ -20,13 +20,11 @@ st.set_page_config(layout="wide")
 
 def ProjectSearch():
     """Project search page with keyword filtering and secondary filtering"""
-    ContextSelector()
-
     # Initialize session state
     SessionState.initialize_state()
     
     # Initialize MongoDB service
-    mongo_service = MongoDBService()
+    mongo_service = get_mongo_service()
     
     # Get current filters from session state
     filters = SessionState.get_filters()
@@ -84,7 +82,6 @@ def ProjectSearch():
                 if df is not None and not df.empty:
                     st.session_state.search_results = df
                     st.session_state.filtered_results = None  # Reset filtered results
-                    st.rerun()
                 else:
                     st.warning("No projects found matching your search criteria.")
                     
@@ -132,24 +129,38 @@ def ProjectSearch():
         with col1:
             st.markdown("**Top Companies by Value**")
             top_by_value = company_stats.nlargest(5, 'total_value')
-            for idx, row in top_by_value.iterrows():
-                st.markdown(f"{idx+1}. **{row['winner']}**  \n"
-                          f"฿{row['total_value']/1e6:.1f}M ({row['project_count']} projects)")
+            st.markdown("\n".join(
+                f"{rank}. **{winner}**  \n"
+                f"฿{total_value/1e6:.1f}M ({project_count} projects)"
+                for rank, (winner, total_value, project_count) in enumerate(zip(
+                    top_by_value['winner'],
+                    top_by_value['total_value'],
+                    top_by_value['project_count']
+                ), start=1)
+            ))
         
         with col2:
             st.markdown("**Top Companies by Projects**")
             top_by_count = company_stats.nlargest(5, 'project_count')
-            for idx, row in top_by_count.iterrows():
-                st.markdown(f"{idx+1}. **{row['winner']}**  \n"
-                          f"{row['project_count']} projects (avg ฿{row['avg_value']/1e6:.1f}M)")
+            st.markdown("\n".join(
+                f"{rank}. **{winner}**  \n"
+                f"{project_count} projects (avg ฿{avg_value/1e6:.1f}M)"
+                for rank, (winner, project_count, avg_value) in enumerate(zip(
+                    top_by_count['winner'],
+                    top_by_count['project_count'],
+                    top_by_count['avg_value']
+                ), start=1)
+            ))
         
         with col3:
             st.markdown("**Top Departments by Projects**")
             top_departments = display_df.groupby('dept_name')['project_name'].count()
             top_departments = top_departments.nlargest(5)
-            for idx, (dept, count) in enumerate(top_departments.items()):
-                st.markdown(f"{idx+1}. **{dept}**  \n"
-                          f"{count} projects")
+            st.markdown("\n".join(
+                f"{rank}. **{dept}**  \n"
+                f"{count} projects"
+                for rank, (dept, count) in enumerate(top_departments.items(), start=1)
+            ))
         
         st.markdown("---")
 
@@ -295,4 +306,6 @@ def ProjectSearch():
         st.info("Enter keywords above and click Search to find projects.")
 
 if __name__ == "__main__":
-    ProjectSearch()
\ No newline at end of file
+    ProjectSearch()
+    # Sidebar renders after the page body so it sees results stored this run
+    ContextSelector()
\ No newline at end of file
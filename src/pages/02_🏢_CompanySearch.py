@@ -2,7 +2,7 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime
 import logging
-from services.database.mongodb import MongoDBService
+from services.database.mongodb import get_mongo_service
 from components.filters.TableFilter import filter_projects
 from components.layout.MetricsSummary import MetricsSummary
 from components.tables.ProjectsTable import ProjectsTable
@@ -17,34 +17,35 @@ logger = logging.getLogger(__name__)
 @st.cache_data(ttl=3600)
 def get_company_options():
     """Get all companies with project counts and winner_tin formatted at the start"""
-    mongo = MongoDBService()
+    mongo = get_mongo_service()
     try:
         collection = mongo.get_collection("companies")
-        companies = list(collection.find(
-            {},
-            {
-                "winner": 1, 
-                "project_count": 1, 
-                "project_ids": 1,
-                "winner_tin": 1
-            }
-        ).sort("project_count", -1))
+        # Count project_ids on the server instead of shipping every id list
+        companies = collection.aggregate([
+            {"$sort": {"project_count": -1}},
+            {"$project": {
+                "_id": 0,
+                "winner": 1,
+                "winner_tin": 1,
+                "id_count": {"$size": {"$ifNull": ["$project_ids", []]}}
+            }},
+            {"$match": {"id_count": {"$gte": 5}}}  # Filter out companies with few projects
+        ])
         
         # Format options with TIN at the start of each company name
         options = []
         for company in companies:
-            project_count = len(company.get('project_ids', []))
+            project_count = company['id_count']
             winner_tin = company.get('winner_tin', '')
             
-            if project_count >= 5:  # Filter out companies with few projects
-                # Format: "0123456789012 บริษัท ชื่อบริษัท จำกัด (1,234 projects)"
-                display_name = f"{winner_tin:<13} {company['winner']} ({project_count:,} projects)"
-                options.append({
-                    'name': company['winner'],
-                    'display': display_name,
-                    'count': project_count,
-                    'winner_tin': winner_tin
-                })
+            # Format: "0123456789012 บริษัท ชื่อบริษัท จำกัด (1,234 projects)"
+            display_name = f"{winner_tin:<13} {company['winner']} ({project_count:,} projects)"
+            options.append({
+                'name': company['winner'],
+                'display': display_name,
+                'count': project_count,
+                'winner_tin': winner_tin
+            })
         
         return options
     except Exception as e:
@@ -53,13 +54,11 @@ def get_company_options():
 
 def CompanySearch():
     """Company search and analysis page"""
-    ContextSelector()
-
     # Initialize session state
     SessionState.initialize_state()
     
     # Initialize MongoDB service
-    mongo_service = MongoDBService()
+    mongo_service = get_mongo_service()
     
     st.markdown("### 🏢 Company Selection")
     
@@ -117,7 +116,6 @@ def CompanySearch():
                 if df is not None and not df.empty:
                     st.session_state.company_results = df
                     st.session_state.filtered_results = None
-                    st.rerun()
                 else:
                     st.warning("No projects found for the selected companies.")
                     
@@ -161,13 +159,21 @@ def CompanySearch():
             })
             company_stats.columns = ['total_value', 'avg_value', 'projects']
             
-            for company in selected_companies:
-                if company in company_stats.index:
-                    stats = company_stats.loc[company]
-                    st.markdown(f"**{company}**  \n"
-                              f"Projects: {stats['projects']:,}  \n"
-                              f"Total Value: ฿{stats['total_value']/1e6:.1f}M  \n"
-                              f"Avg Value: ฿{stats['avg_value']/1e6:.1f}M")
+            overview = company_stats.reindex(
+                [company for company in selected_companies if company in company_stats.index]
+            )
+            st.markdown("\n\n".join(
+                f"**{company}**  \n"
+                f"Projects: {projects:,}  \n"
+                f"Total Value: ฿{total_value/1e6:.1f}M  \n"
+                f"Avg Value: ฿{avg_value/1e6:.1f}M"
+                for company, total_value, avg_value, projects in zip(
+                    overview.index,
+                    overview['total_value'],
+                    overview['avg_value'],
+                    overview['projects']
+                )
+            ))
         
         with col2:
             st.markdown("**Top Departments**")
@@ -175,21 +181,23 @@ def CompanySearch():
             dept_stats = dept_stats.nlargest(5)
             
             total_projects = len(display_df)
-            for dept, count in dept_stats.items():
-                percentage = (count / total_projects) * 100
-                st.markdown(f"**{dept}**  \n"
-                          f"{count:,} projects ({percentage:.1f}%)")
+            st.markdown("\n\n".join(
+                f"**{dept}**  \n"
+                f"{count:,} projects ({count / total_projects * 100:.1f}%)"
+                for dept, count in dept_stats.items()
+            ))
         
         with col3:
             st.markdown("**Procurement Methods**")
             method_stats = display_df.groupby('purchase_method_name')['project_name'].count()
             method_stats = method_stats.nlargest(5)
             
-            for method, count in method_stats.items():
-                if pd.notna(method):
-                    percentage = (count / total_projects) * 100
-                    st.markdown(f"**{method}**  \n"
-                              f"{count:,} projects ({percentage:.1f}%)")
+            st.markdown("\n\n".join(
+                f"**{method}**  \n"
+                f"{count:,} projects ({count / total_projects * 100:.1f}%)"
+                for method, count in method_stats.items()
+                if pd.notna(method)
+            ))
         
         st.markdown("---")
 
@@ -199,10 +207,16 @@ def CompanySearch():
         st.markdown("### 📊 Project Value Distribution")
         st.markdown("Compare the range of project values for each company")
 
+        # Split project values (in millions) by company once; each company is
+        # then a dict lookup instead of a boolean-mask scan of display_df
+        company_values = dict(tuple(
+            (display_df['sum_price_agree'] / 1e6).groupby(display_df['winner'], sort=False)
+        ))
+        no_values = pd.Series(dtype=float)
+
         fig = go.Figure()
         for company in selected_companies:
-            company_data = display_df[display_df['winner'] == company]
-            values = company_data['sum_price_agree'] / 1e6  # Convert to millions
+            values = company_values.get(company, no_values)
             
             fig.add_trace(go.Box(
                 x=values,
@@ -247,9 +261,9 @@ def CompanySearch():
             with col2:
                 st.markdown("**Value Ranges**")
                 for company in selected_companies:
-                    company_data = display_df[display_df['winner'] == company]
-                    q1 = company_data['sum_price_agree'].quantile(0.25) / 1e6
-                    q3 = company_data['sum_price_agree'].quantile(0.75) / 1e6
+                    values = company_values.get(company, no_values)
+                    q1 = values.quantile(0.25)
+                    q3 = values.quantile(0.75)
                     iqr = q3 - q1
                     st.markdown(f"**{company}**  \n"
                             f"Middle 50% range: ฿{q1:.1f}M - ฿{q3:.1f}M  \n"
@@ -368,4 +382,6 @@ def CompanySearch():
         st.info("Select one or more companies above and click Search to find projects.")
 
 if __name__ == "__main__":
-    CompanySearch()
\ No newline at end of file
+    CompanySearch()
+    # Sidebar renders after the page body so it sees results stored this run
+    ContextSelector()
\ No newline at end of file
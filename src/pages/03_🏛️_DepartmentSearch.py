@@ -9,27 +9,26 @@ from components.filters.TableFilter import filter_projects
 from components.tables.ProjectsTable import ProjectsTable
 from components.layout.ContextSelector import ContextSelector
 from state.session import SessionState
-from services.database.mongodb import MongoDBService
+from services.database.mongodb import get_mongo_service
 from services.analytics.period_analysis import PeriodAnalysisService
 from services.analytics.company_projects import CompanyProjectsService
 from services.analytics.subdept_projects import display_subdepartment_distribution
 from services.cache.department_cache import (
     get_departments,
-    get_department_stats,
-    get_subdepartment_stats
+    get_all_department_stats,
+    get_department_labels,
+    get_all_subdepartment_stats
 )
 
 st.set_page_config(layout="wide")
 
 def DepartmentSearch():
     """Department search page with multi-department selection and secondary filtering"""
-    ContextSelector()
-
     # Initialize session state
     SessionState.initialize_state()
     
     # Initialize MongoDB service
-    mongo_service = MongoDBService()
+    mongo_service = get_mongo_service()
     
     # Get current filters from session state
     filters = SessionState.get_filters()
@@ -37,60 +36,46 @@ def DepartmentSearch():
     # Department selection section
     st.markdown("### 🏢 Department Selection")
     
-    # Get departments with cached statistics
+    # Get departments with cached statistics and preformatted labels
     dept_options = get_departments()
+    all_dept_stats = get_all_department_stats()
+    dept_labels = get_department_labels()
     
-    # Format department options to show stats
-    dept_display_options = []
-    dept_mapping = {}  # To map display strings back to department names
-    
-    for dept in dept_options:
-        stats = get_department_stats(dept)
-        if stats:
-            display_text = f"{dept} ({stats['count']:,} projects, ฿{stats['total_value_millions']:.1f}M)"
-            dept_display_options.append(display_text)
-            dept_mapping[display_text] = dept
-    
-    # Multi-select for departments with statistics
-    selected_display_depts = st.multiselect(
+    # Multi-select over department names, displayed with their statistics
+    selected_departments = st.multiselect(
         "Select Departments",
-        options=dept_display_options,
+        options=[dept for dept in dept_options if dept in dept_labels],
+        format_func=dept_labels.__getitem__,
         key="department_select",
         help="Select one or more departments to analyze"
     )
     
-    # Convert display selections back to department names
-    selected_departments = [dept_mapping[display] for display in selected_display_depts]
-    
     # Sub-department selection (only show if departments are selected)
     selected_subdepartments = []
     if selected_departments:
-        # Get sub-department stats for all selected departments
+        # Get sub-department stats for all selected departments from the
+        # mapping fetched once for every department, so changing the
+        # selection is a dict lookup rather than a query per department
+        subdept_stats_by_dept = get_all_subdepartment_stats()
         all_subdept_stats = {}
         for dept in selected_departments:
-            subdept_stats = get_subdepartment_stats(dept)
-            all_subdept_stats.update(subdept_stats)
+            all_subdept_stats.update(subdept_stats_by_dept.get(dept, {}))
         
-        # Create formatted sub-department options
-        subdept_display_options = []
-        subdept_mapping = {}
+        # Create formatted sub-department labels
+        subdept_labels = {
+            subdept: f"{subdept} ({stats['count']:,} projects, ฿{stats['total_value_millions']:.1f}M)"
+            for subdept, stats in all_subdept_stats.items()
+            if pd.notna(subdept)  # Filter out NaN/None values
+        }
         
-        for subdept, stats in all_subdept_stats.items():
-            if pd.notna(subdept):  # Filter out NaN/None values
-                display_text = f"{subdept} ({stats['count']:,} projects, ฿{stats['total_value_millions']:.1f}M)"
-                subdept_display_options.append(display_text)
-                subdept_mapping[display_text] = subdept
-        
-        # Multi-select for sub-departments
-        selected_display_subdepts = st.multiselect(
+        # Multi-select for sub-departments, ordered by their labels
+        selected_subdepartments = st.multiselect(
             "Select Sub-departments (Optional)",
-            options=sorted(subdept_display_options),
+            options=sorted(subdept_labels, key=subdept_labels.__getitem__),
+            format_func=subdept_labels.__getitem__,
             key="subdepartment_select",
             help="Optionally select specific sub-departments to narrow your search"
         )
-        
-        # Convert display selections back to sub-department names
-        selected_subdepartments = [subdept_mapping[display] for display in selected_display_subdepts]
     
     # Search and Clear buttons
     col1, col2 = st.columns([1, 5])
@@ -133,7 +118,6 @@ def DepartmentSearch():
                 if df is not None and not df.empty:
                     st.session_state.department_results = df
                     st.session_state.filtered_results = None  # Reset filtered results
-                    st.rerun()
                 else:
                     st.warning("No projects found for the selected departments.")
                     
@@ -171,13 +155,16 @@ def DepartmentSearch():
         
         with col1:
             st.markdown("**Department Overview**")
-            for dept in selected_departments:
-                stats = get_department_stats(dept)
-                if stats:
-                    st.markdown(f"**{dept}**  \n"
-                              f"Projects: {stats['count']:,}  \n"
-                              f"Value: ฿{stats['total_value_millions']:.1f}M  \n"
-                              f"Companies: {stats['unique_companies']:,}")
+            st.markdown("\n\n".join(
+                f"**{dept}**  \n"
+                f"Projects: {stats['count']:,}  \n"
+                f"Value: ฿{stats['total_value_millions']:.1f}M  \n"
+                f"Companies: {stats['unique_companies']:,}"
+                for dept, stats in (
+                    (dept, all_dept_stats.get(dept)) for dept in selected_departments
+                )
+                if stats
+            ))
         
         with col2:
             st.markdown("**Top Companies**")
@@ -187,9 +174,15 @@ def DepartmentSearch():
             }).reset_index()
             
             top_companies = company_stats.nlargest(5, 'sum_price_agree')
-            for idx, row in top_companies.iterrows():
-                st.markdown(f"{idx+1}. **{row['winner']}**  \n"
-                          f"฿{row['sum_price_agree']/1e6:.1f}M ({row['project_name']} projects)")
+            st.markdown("\n".join(
+                f"{rank}. **{winner}**  \n"
+                f"฿{total_value/1e6:.1f}M ({project_count} projects)"
+                for rank, (winner, total_value, project_count) in enumerate(zip(
+                    top_companies['winner'],
+                    top_companies['sum_price_agree'],
+                    top_companies['project_name']
+                ), start=1)
+            ))
         
         with col3:
             st.markdown("**Procurement Methods**")
@@ -197,11 +190,12 @@ def DepartmentSearch():
             method_stats = method_stats.nlargest(5)
             
             total_projects = len(display_df)
-            for method, count in method_stats.items():
-                if pd.notna(method):
-                    percentage = (count / total_projects) * 100
-                    st.markdown(f"**{method}**  \n"
-                              f"{count:,} projects ({percentage:.1f}%)")
+            st.markdown("\n\n".join(
+                f"**{method}**  \n"
+                f"{count:,} projects ({count / total_projects * 100:.1f}%)"
+                for method, count in method_stats.items()
+                if pd.notna(method)
+            ))
         
         st.markdown("---")
 
@@ -348,4 +342,6 @@ def DepartmentSearch():
         st.info("Select one or more departments above and click Search to find projects.")
 
 if __name__ == "__main__":
-    DepartmentSearch()
\ No newline at end of file
+    DepartmentSearch()
+    # Sidebar renders after the page body so it sees results stored this run
+    ContextSelector()
\ No newline at end of file
@@ -1,7 +1,6 @@
 # src/pages/ContextManager.py
 
 import streamlit as st
-import pandas as pd
 from datetime import datetime
 from typing import Dict, Any
 from services.database.collections_manager import (
@@ -10,13 +9,7 @@ from services.database.collections_manager import (
     delete_collection
 )
 from components.tables.ProjectsTable import ProjectsTable  # Import ProjectsTable component
-
-def handle_duplicate_projects(df: pd.DataFrame) -> pd.DataFrame:
-    """Remove duplicate projects based on project_id if it exists"""
-    if 'project_id' in df.columns:
-        # Keep first occurrence of each project_id
-        df = df.drop_duplicates(subset=['project_id'], keep='first')
-    return df
+from components.layout.ContextSelector import handle_duplicate_projects, add_to_context_df
 
 def display_collection_card(collection: Dict[str, Any], on_add_to_context):
     """Display a collection as a card with actions"""
@@ -77,6 +70,7 @@ def ContextManager():
         st.session_state.context_collections = []
     if 'context_df' not in st.session_state:
         st.session_state.context_df = None
+        st.session_state.pop('context_ids', None)
     
     st.title("📚 Context Manager")
     
@@ -88,7 +82,7 @@ def ContextManager():
         if st.session_state.context_df is not None:
             # Get original and deduplicated counts
             original_count = len(st.session_state.context_df)
-            deduplicated_df = handle_duplicate_projects(st.session_state.context_df.copy())
+            deduplicated_df = handle_duplicate_projects(st.session_state.context_df)
             deduplicated_count = len(deduplicated_df)
             
             st.markdown(f"""
@@ -113,6 +107,7 @@ def ContextManager():
         if st.button("🔄 Reset Context", use_container_width=True):
             st.session_state.context_collections = []
             st.session_state.context_df = None
+            st.session_state.pop('context_ids', None)
             st.rerun()
     
     # Display current context collections
@@ -173,16 +168,8 @@ def ContextManager():
                 # Add to context collections list
                 st.session_state.context_collections.append(collection)
                 
-                # Update context DataFrame
-                if st.session_state.context_df is None:
-                    st.session_state.context_df = new_df
-                else:
-                    combined_df = pd.concat(
-                        [st.session_state.context_df, new_df],
-                        ignore_index=True
-                    )
-                    # Remove duplicates when combining
-                    st.session_state.context_df = handle_duplicate_projects(combined_df)
+                # Update context DataFrame (duplicates are skipped)
+                add_to_context_df(new_df)
                 
                 st.success(f"Added '{collection['name']}' to context")
                 st.rerun()
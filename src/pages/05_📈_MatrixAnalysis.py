@@ -16,10 +16,9 @@ def create_heatmap(df: pd.DataFrame, metric: str):
         {'name': '300M+', 'min': 300, 'max': float('inf')}
     ]
     
-    top_companies = (df.groupby('winner')['sum_price_agree']
+    top_companies = (df.groupby('winner', sort=False)['sum_price_agree']
                     .sum()
-                    .sort_values(ascending=False)
-                    .head(10)
+                    .nlargest(10)
                     .index)
     
     data = []
@@ -60,7 +60,7 @@ def StackedCompany():
             df['time_group'] = df['transaction_date'].dt.strftime('%Y-%m')
 
         # Get top companies by total value
-        top_companies = df.groupby('winner')['sum_price_agree'].sum().nlargest(num_companies).index
+        top_companies = df.groupby('winner', sort=False)['sum_price_agree'].sum().nlargest(num_companies).index
 
         # Filter for top companies and sort by time_group
         company_data = df[df['winner'].isin(top_companies)].groupby(['time_group', 'winner']).agg({
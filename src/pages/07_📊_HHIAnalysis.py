@@ -2,6 +2,7 @@
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.graph_objects as go
 from components.layout.MetricsSummary import create_distribution_bar
 from components.layout.ContextSelector import ContextSelector
@@ -22,8 +23,10 @@ def calculate_hhi(market_shares):
     Returns:
         float: HHI value (0-10000)
     """
-    # Convert percentages to proportions (0-1) before squaring
-    return round(sum((share/100) ** 2 * 10000 for share in market_shares), 2)
+    # (share/100)^2 * 10000 == share^2, so HHI is the dot product of the
+    # percentage shares with themselves
+    shares = np.asarray(market_shares, dtype=float)
+    return round(float(np.dot(shares, shares)), 2)
 
 def interpret_hhi(hhi):
     """Interpret HHI value"""
@@ -2,7 +2,7 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime
 import logging
-from services.database.mongodb import MongoDBService
+from services.database.mongodb import MongoDBService, get_mongo_service
 from typing import List, Dict, Any, Optional
 import plotly.graph_objects as go
 
@@ -194,8 +194,7 @@ def create_trend_chart(data: List[Dict[str, Any]], companies: List[str]) -> go.F
 @st.cache_data(ttl=3600)
 def get_all_companies():
     """Get all companies with caching"""
-    mongo = MongoDBService()
-    mongo.ensure_connection()  # Ensure fresh connection
+    mongo = get_mongo_service()
     
     try:
         collection = mongo.get_collection("companies")
@@ -291,8 +290,7 @@ def CompanySearch():
         st.session_state.company2 = None
     
     # Initialize MongoDB service
-    mongo = MongoDBService()
-    mongo.ensure_connection()
+    mongo = get_mongo_service()
     
     try:
         # Get companies data
@@ -462,8 +460,15 @@ def get_quarterly_trends(df: pd.DataFrame, companies: List[str]) -> List[Dict[st
     
     return quarterly_data
 
-def get_company_data(company_name: str, mongo_service: MongoDBService) -> Optional[Dict]:
-    """Get company data with proper connection management"""
+@st.cache_data(ttl=600, show_spinner=False)
+def get_company_data(company_name: str, _mongo_service: MongoDBService) -> Optional[Dict]:
+    """
+    Get company data with proper connection management
+    
+    Cached per company name, so reruns with the same two companies selected
+    skip both the company lookup and the project fetch.
+    """
+    mongo_service = _mongo_service
     try:
         collection = mongo_service.get_collection("companies")
         company_doc = collection.find_one({"winner": company_name})
@@ -50,12 +50,12 @@ class CompanyProjectsService:
             range_df = df[
                 (df['value_millions'] >= value_range['min']) &
                 (df['value_millions'] < value_range['max'])
-            ].copy()
+            ]
             
             if not range_df.empty:
                 # Get top companies for this range
-                company_totals = range_df.groupby('winner')['value_millions'].sum()
-                top_companies = company_totals.sort_values(ascending=False).head(top_n).index
+                company_totals = range_df.groupby('winner', sort=False)['value_millions'].sum()
+                top_companies = company_totals.nlargest(top_n).index
                 
                 # Filter for top companies and sort
                 range_df = range_df[range_df['winner'].isin(top_companies)]
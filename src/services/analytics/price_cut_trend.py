@@ -34,10 +34,9 @@ class CompanyPriceCutAnalysis:
         """
         try:
             company_totals = (
-                self.df.groupby('winner')['sum_price_agree']
+                self.df.groupby('winner', sort=False)['sum_price_agree']
                 .sum()
-                .sort_values(ascending=False)
-                .head(n)
+                .nlargest(n)
             )
             return company_totals.index.tolist()
         except Exception as e:
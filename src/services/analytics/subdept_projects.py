@@ -36,8 +36,12 @@ class SubDepartmentProjectsService:
         df['value_millions'] = df['sum_price_agree'] / 1e6
         df['transaction_date'] = pd.to_datetime(df['transaction_date'])
         
-        # Replace missing sub-departments with 'Other'
-        df['dept_sub_name'] = df['dept_sub_name'].fillna('Other')
+        # Replace missing sub-departments with 'Other' and store them as a
+        # categorical, so the per-range groupby/isin/sort work on integer codes
+        subdepts = df['dept_sub_name'].astype('category')
+        if 'Other' not in subdepts.cat.categories:
+            subdepts = subdepts.cat.add_categories('Other')
+        df['dept_sub_name'] = subdepts.fillna('Other')
         
         # Split data by value ranges
         range_data = {}
@@ -46,12 +50,12 @@ class SubDepartmentProjectsService:
             range_df = df[
                 (df['value_millions'] >= value_range['min']) &
                 (df['value_millions'] < value_range['max'])
-            ].copy()
+            ]
             
             if not range_df.empty:
                 # Get top sub-departments for this range
-                subdept_totals = range_df.groupby('dept_sub_name')['value_millions'].sum()
-                top_subdepts = subdept_totals.sort_values(ascending=False).head(top_n).index
+                subdept_totals = range_df.groupby('dept_sub_name', sort=False, observed=True)['value_millions'].sum()
+                top_subdepts = subdept_totals.nlargest(top_n).index
                 
                 # Filter for top sub-departments and sort
                 range_df = range_df[range_df['dept_sub_name'].isin(top_subdepts)]
@@ -75,11 +79,11 @@ class SubDepartmentProjectsService:
             raise ValueError(f"Empty DataFrame for range {range_name}")
         
         # Get sub-departments sorted by total value
-        subdept_totals = df.groupby('dept_sub_name')['value_millions'].sum()
-        subdepts = subdept_totals.sort_values(ascending=False).index
+        subdept_totals = df.groupby('dept_sub_name', observed=True)['value_millions'].sum()
+        subdepts = subdept_totals.sort_values(ascending=False).index.tolist()
         
         # Calculate project counts per sub-department
-        project_counts = df.groupby('dept_sub_name').size()
+        project_counts = df.groupby('dept_sub_name', observed=True).size()
         
         fig = go.Figure()
         
@@ -127,7 +127,7 @@ class TreemapService:
         id_col: str,
         value_col: str,
         hover_data: Optional[Dict[str, str]] = None,
-        custom_data: Optional[List] = None,
+        custom_data: Optional[Union[np.ndarray, List]] = None,
         title: Optional[str] = None,
         height: int = 600,
         color_scheme: Optional[Union[str, List[str]]] = None,
@@ -143,12 +143,14 @@ class TreemapService:
             id_col: Column for node IDs
             value_col: Column for node values
             hover_data: Hover text format strings
-            custom_data: Additional data for hover template
+            custom_data: Additional data for hover template, ideally a 2D array
+                with one row per node (passed to Plotly without conversion)
             title: Chart title
             height: Chart height
             color_scheme: Color scheme for nodes
             show_percentages: Whether to show percentage in labels
-            text_template: Custom template for node text
+            text_template: Plotly texttemplate for node text; with show_percentages
+                the node's percentage is available as %{text}
             layout_options: Additional layout options
         """
         try:
@@ -167,31 +169,30 @@ class TreemapService:
                     "Value: %{value:,.0f}<extra></extra>"
                 )
             
-            # Prepare text info
+            # Prepare text info: raw values are shipped and the template is
+            # applied by Plotly in the browser
+            labels = data[id_col].to_numpy()
             if text_template and show_percentages:
                 # Get percentage column name
                 pct_col = (
                     'count_percentage' if 'count' in value_col 
                     else 'value_percentage'
                 )
-                # Format labels with template
-                labels = [
-                    text_template.format(row[id_col], row[pct_col])
-                    for _, row in data.iterrows()
-                ]
+                text = data[pct_col].to_numpy()
             else:
-                labels = data[id_col]
+                text = labels
+                text_template = text_template or "%{text}"
             
             # Create figure
             fig = go.Figure(go.Treemap(
-                ids=data[id_col],
-                parents=[''] * len(data),
-                values=data[value_col],
+                ids=data[id_col].to_numpy(),
+                parents=np.full(len(data), '', dtype=object),
+                values=data[value_col].to_numpy(),
                 labels=labels,
                 customdata=custom_data,
                 textposition="middle center",
-                textinfo="text",
-                text=labels,
+                text=text,
+                texttemplate=text_template,
                 hovertemplate=hover_template,
                 marker=dict(
                     colors=colors,
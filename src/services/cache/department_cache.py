@@ -3,7 +3,8 @@
 import logging
 from typing import List, Dict, Any
 import time
-from services.database.mongodb import MongoDBService
+import streamlit as st
+from services.database.mongodb import get_mongo_service
 from services.cache.cache_manager import CacheManager
 
 logger = logging.getLogger(__name__)
@@ -39,7 +40,7 @@ class DepartmentCache:
             ):
                 logger.info("Refreshing departments cache from aggregation")
                 
-                with MongoDBService() as db:
+                with get_mongo_service() as db:
                     # Get all departments without limit
                     dept_summary = db.get_department_summary(view_by="count", limit=None)
                     
@@ -96,7 +97,7 @@ class DepartmentCache:
         
         try:
             if force_refresh:
-                with MongoDBService() as db:
+                with get_mongo_service() as db:
                     # Get all subdepartments without limit
                     subdept_data = db.get_subdepartment_data(dept_name, limit=None)
                     
@@ -139,44 +140,143 @@ class DepartmentCache:
         """
         return self._department_stats.get(dept_name, {})
     
+    def get_all_department_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get statistics for every department in one call
+        
+        Returns:
+            Dict[str, Dict[str, Any]]: Department statistics keyed by department name
+        """
+        if not self._department_stats:
+            self.get_departments(force_refresh=True)
+        return dict(self._department_stats)
+    
+    def get_department_labels(self) -> Dict[str, str]:
+        """
+        Get display labels for every department, formatted once per refresh
+        
+        Returns:
+            Dict[str, str]: Label such as "dept (1,234 projects, ฿56.7M)" keyed by department name
+        """
+        return {
+            dept: f"{dept} ({stats['count']:,} projects, ฿{stats['total_value_millions']:.1f}M)"
+            for dept, stats in self.get_all_department_stats().items()
+        }
+    
+    @staticmethod
+    def _subdepartment_stats(subdept_data: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Statistics keyed by sub-department name from sub-department rows"""
+        return {
+            sub["subdepartment"]: {
+                "count": sub["count"],
+                "total_value": sub["total_value"],
+                "total_value_millions": sub["total_value_millions"],
+                "count_percentage": sub["count_percentage"],
+                "value_percentage": sub["value_percentage"],
+                "unique_companies": sub["unique_companies"]
+            }
+            for sub in subdept_data
+            if sub["subdepartment"]
+        }
+    
     def get_subdepartment_stats(self, dept_name: str) -> Dict[str, Dict[str, Any]]:
         """Get statistics for all subdepartments of a department"""
         try:
-            with MongoDBService() as db:
+            with get_mongo_service() as db:
                 # Get all subdepartments without limit
                 subdept_data = db.get_subdepartment_data(dept_name, limit=None)
+                return self._subdepartment_stats(subdept_data)
+        except Exception as e:
+            logger.error(f"Error getting subdepartment stats for {dept_name}: {e}")
+            return {}
+    
+    def get_all_subdepartment_stats(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """
+        Get sub-department statistics for every department in one query
+        
+        Returns:
+            Dict[str, Dict[str, Dict[str, Any]]]: Sub-department statistics keyed by department
+        """
+        try:
+            with get_mongo_service() as db:
                 return {
-                    sub["subdepartment"]: {
-                        "count": sub["count"],
-                        "total_value": sub["total_value"],
-                        "total_value_millions": sub["total_value_millions"],
-                        "count_percentage": sub["count_percentage"],
-                        "value_percentage": sub["value_percentage"],
-                        "unique_companies": sub["unique_companies"]
-                    }
-                    for sub in subdept_data
-                    if sub["subdepartment"]
+                    dept: self._subdepartment_stats(subdept_data)
+                    for dept, subdept_data in db.get_all_subdepartment_data().items()
                 }
         except Exception as e:
-            logger.error(f"Error getting subdepartment stats for {dept_name}: {e}")
+            logger.error(f"Error getting subdepartment stats for all departments: {e}")
             return {}
 
 # Create singleton instance
 _department_cache = DepartmentCache()
 
-# Export convenience functions
+# Export convenience functions (memoized across Streamlit reruns)
+# The refresh flag is underscore-prefixed so it stays out of the cache key;
+# a forced refresh clears the memoized results before looking them up again
+@st.cache_data(ttl=600, show_spinner=False)
+def _get_departments(_force_refresh: bool = False) -> List[str]:
+    return _department_cache.get_departments(_force_refresh)
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _get_sub_departments(dept_name: str, _force_refresh: bool = False) -> List[str]:
+    return _department_cache.get_sub_departments(dept_name, _force_refresh)
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _get_all_department_stats() -> Dict[str, Dict[str, Any]]:
+    return _department_cache.get_all_department_stats()
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _get_department_labels() -> Dict[str, str]:
+    return _department_cache.get_department_labels()
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _get_subdepartment_stats(dept_name: str) -> Dict[str, Dict[str, Any]]:
+    return _department_cache.get_subdepartment_stats(dept_name)
+
+def _uncached_if_empty(cached_func, *args):
+    """
+    Call a memoized lookup, dropping its cache when the result is empty
+    
+    DepartmentCache falls back to empty results on errors; those must not
+    stay memoized for every session until the TTL runs out.
+    """
+    result = cached_func(*args)
+    if not result:
+        cached_func.clear()
+    return result
+
 def get_departments(force_refresh: bool = False) -> List[str]:
     """Get departments ranked by frequency"""
-    return _department_cache.get_departments(force_refresh)
+    if force_refresh:
+        _get_departments.clear()
+    return _uncached_if_empty(_get_departments, force_refresh)
 
 def get_sub_departments(dept_name: str, force_refresh: bool = False) -> List[str]:
     """Get sub-departments ranked by frequency"""
-    return _department_cache.get_sub_departments(dept_name, force_refresh)
+    if force_refresh:
+        _get_sub_departments.clear()
+    return _uncached_if_empty(_get_sub_departments, dept_name, force_refresh)
 
 def get_department_stats(dept_name: str) -> Dict[str, Any]:
     """Get department statistics"""
     return _department_cache.get_department_stats(dept_name)
 
+def get_all_department_stats() -> Dict[str, Dict[str, Any]]:
+    """Get statistics for all departments keyed by department name"""
+    return _uncached_if_empty(_get_all_department_stats)
+
+def get_department_labels() -> Dict[str, str]:
+    """Get preformatted department display labels keyed by department name"""
+    return _uncached_if_empty(_get_department_labels)
+
 def get_subdepartment_stats(dept_name: str) -> Dict[str, Dict[str, Any]]:
     """Get subdepartment statistics"""
-    return _department_cache.get_subdepartment_stats(dept_name)
\ No newline at end of file
+    return _uncached_if_empty(_get_subdepartment_stats, dept_name)
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _get_all_subdepartment_stats() -> Dict[str, Dict[str, Dict[str, Any]]]:
+    return _department_cache.get_all_subdepartment_stats()
+
+def get_all_subdepartment_stats() -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """Get subdepartment statistics for all departments keyed by department name"""
+    return _uncached_if_empty(_get_all_subdepartment_stats)
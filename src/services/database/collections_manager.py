@@ -1,6 +1,7 @@
 # src/services/database/collections.py
 
 import pandas as pd
+import streamlit as st
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 import logging
@@ -217,6 +218,8 @@ class CollectionService:
 _collection_service = CollectionService()
 
 # Export convenience functions
+# Listings and collection data are cached across reruns (the sidebar lists
+# collections on every widget interaction); saving or deleting clears them
 def save_collection(
     df: pd.DataFrame,
     name: str,
@@ -224,8 +227,12 @@ def save_collection(
     tags: List[str],
     source: str
 ) -> bool:
-    return _collection_service.save_collection(df, name, description, tags, source)
+    saved = _collection_service.save_collection(df, name, description, tags, source)
+    if saved:
+        _clear_cached_collections()
+    return saved
 
+@st.cache_data(ttl=300, show_spinner=False)
 def get_collections(
     search: Optional[str] = None,
     sort_by: str = "created_at",
@@ -236,8 +243,16 @@ def get_collections(
 def get_collection(name: str) -> Optional[Dict[str, Any]]:
     return _collection_service.get_collection(name)
 
+@st.cache_data(ttl=300, show_spinner=False)
 def get_collection_df(name: str) -> Optional[pd.DataFrame]:
     return _collection_service.get_collection_df(name)
 
 def delete_collection(name: str) -> bool:
-    return _collection_service.delete_collection(name)
\ No newline at end of file
+    deleted = _collection_service.delete_collection(name)
+    if deleted:
+        _clear_cached_collections()
+    return deleted
+
+def _clear_cached_collections():
+    get_collections.clear()
+    get_collection_df.clear()
\ No newline at end of file
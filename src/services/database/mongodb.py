@@ -2,11 +2,15 @@
 
 import os
 import logging
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Iterable
+from array import array
+from math import nan
 from pymongo import MongoClient
 from pymongo.collection import Collection
 from pymongo.errors import ConnectionFailure, AutoReconnect, ServerSelectionTimeoutError, InvalidOperation
+import numpy as np
 import pandas as pd
+import streamlit as st
 from functools import wraps
 from dotenv import load_dotenv
 import threading
@@ -35,11 +39,60 @@ def retry_on_connection_error(max_retries: int = 3, delay: float = 1.0):
         return wrapper
     return decorator
 
+def cursor_to_dataframe(cursor, chunk_size: int = 5000, float_fields: Iterable[str] = ()) -> pd.DataFrame:
+    """
+    Build a DataFrame from a MongoDB cursor column by column
+    
+    Documents are consumed one at a time straight into per-field columns, so
+    neither a list of documents nor intermediate frames are materialized.
+    
+    Args:
+        cursor: PyMongo cursor
+        chunk_size: Documents fetched per round-trip
+        float_fields: Fields known to hold numbers or null; they are collected
+            into contiguous float64 buffers (null or missing -> NaN)
+        
+    Returns:
+        pd.DataFrame: One column per field seen (empty if the cursor yields nothing)
+    """
+    float_fields = frozenset(float_fields)
+    columns = {}
+    row_count = 0
+    
+    for document in cursor.batch_size(chunk_size):
+        for field, value in document.items():
+            column = columns.get(field)
+            if column is None:
+                # Field first seen now: earlier rows are missing it
+                if field in float_fields:
+                    column = columns[field] = array('d', [nan]) * row_count
+                else:
+                    column = columns[field] = [None] * row_count
+            if value is None and field in float_fields:
+                value = nan
+            column.append(value)
+        row_count += 1
+        
+        # Pad columns this document did not have
+        if len(document) < len(columns):
+            for field, column in columns.items():
+                if len(column) < row_count:
+                    column.append(nan if field in float_fields else None)
+    
+    if not columns:
+        return pd.DataFrame()
+    
+    return pd.DataFrame({
+        field: np.frombuffer(column, dtype=np.float64) if isinstance(column, array) else column
+        for field, column in columns.items()
+    })
+
 class MongoDBService:
     """Service class for MongoDB operations with thread-safe connection management"""
     
     _instance = None
     _lock = threading.Lock()
+    _client_lock = threading.RLock()
     
     def __new__(cls):
         with cls._lock:
@@ -53,75 +106,100 @@ class MongoDBService:
         load_dotenv(override=True)
         self.mongo_uri = os.getenv('MONGO_URI')
         self.db_name = 'projects'
+        self.max_pool_size = int(os.getenv('MONGO_MAX_POOL_SIZE', '50'))
+        self.min_pool_size = int(os.getenv('MONGO_MIN_POOL_SIZE', '10'))
+        # A single MongoClient (and its connection pool) is shared by every
+        # session thread; MongoClient is thread-safe and leases sockets per operation
         self._client = None
         self._database = None
-        self._local = threading.local()
+        self._collection_names = frozenset()
     
     def ensure_connection(self):
-        """Ensure connection is active and reconnect if necessary"""
-        try:
-            if not hasattr(self._local, 'client') or self._local.client is None:
-                self.connect()
-            else:
-                # Test connection
-                self._local.client.admin.command('ping')
-        except Exception:
+        """Ensure the shared client exists, connecting on first use"""
+        # No ping per call: MongoClient monitors the servers in the background
+        # and reconnects pooled sockets itself, so a live client stays usable
+        if self._client is None:
             self.connect()
     
     @retry_on_connection_error()
     def connect(self):
-        """Establish connection to MongoDB"""
-        try:
-            self._local.client = MongoClient(
-                self.mongo_uri,
-                serverSelectionTimeoutMS=5000,
-                connectTimeoutMS=5000,
-                maxPoolSize=50,
-                minPoolSize=10,
-                maxIdleTimeMS=45000,
-                waitQueueTimeoutMS=5000
-            )
-            self._local.database = self._local.client[self.db_name]
-            # Test connection
-            self._local.client.admin.command('ping')
-            logger.info(f"Successfully connected to MongoDB database: {self.db_name}")
-            
-            # Verify collections
-            collections = self._local.database.list_collection_names()
-            logger.info(f"Available collections: {collections}")
+        """Establish the shared connection pool to MongoDB"""
+        with self._client_lock:
+            # Another session thread may have connected while we waited
+            if self._client is not None:
+                try:
+                    self._client.admin.command('ping')
+                    return
+                except Exception:
+                    self._client.close()
+                    self._client = None
+                    self._database = None
+                    self._collection_names = frozenset()
             
-        except Exception as e:
-            logger.error(f"Failed to connect to MongoDB: {e}")
-            if hasattr(self._local, 'client') and self._local.client:
-                self._local.client.close()
-            self._local.client = None
-            self._local.database = None
-            raise
+            try:
+                self._client = MongoClient(
+                    self.mongo_uri,
+                    serverSelectionTimeoutMS=5000,
+                    connectTimeoutMS=5000,
+                    maxPoolSize=self.max_pool_size,
+                    minPoolSize=self.min_pool_size,
+                    maxIdleTimeMS=45000,
+                    waitQueueTimeoutMS=5000
+                )
+                self._database = self._client[self.db_name]
+                # Test connection
+                self._client.admin.command('ping')
+                logger.info(f"Successfully connected to MongoDB database: {self.db_name}")
+                
+                # Verify collections
+                self._refresh_collection_names()
+                logger.info(f"Available collections: {sorted(self._collection_names)}")
+                
+            except Exception as e:
+                logger.error(f"Failed to connect to MongoDB: {e}")
+                if self._client:
+                    self._client.close()
+                self._client = None
+                self._database = None
+                self._collection_names = frozenset()
+                raise
     
     def disconnect(self):
-        """Close MongoDB connection"""
-        try:
-            if hasattr(self._local, 'client') and self._local.client:
-                self._local.client.close()
-                self._local.client = None
-                self._local.database = None
-                logger.info("Disconnected from MongoDB")
-        except Exception as e:
-            logger.error(f"Error disconnecting from MongoDB: {e}")
+        """Close the shared MongoDB connection pool"""
+        with self._client_lock:
+            try:
+                if self._client:
+                    self._client.close()
+                    self._client = None
+                    self._database = None
+                    self._collection_names = frozenset()
+                    logger.info("Disconnected from MongoDB")
+            except Exception as e:
+                logger.error(f"Error disconnecting from MongoDB: {e}")
     
     @retry_on_connection_error()
     def get_collection(self, collection_name: str = 'projects') -> Collection:
         """Get MongoDB collection"""
         self.ensure_connection()
         
-        if not hasattr(self._local, 'database') or self._local.database is None:
+        database = self._database
+        if database is None:
             raise ValueError("Database connection not established")
         
-        collections = self._local.database.list_collection_names()
-        if collection_name not in collections:
-            raise ValueError(f"Collection '{collection_name}' not found. Available: {collections}")
+        # Collection names are cached per connection; only re-list on a miss
+        # in case the collection was created after we connected
+        if collection_name not in self._collection_names:
+            self._refresh_collection_names()
+            if collection_name not in self._collection_names:
+                raise ValueError(
+                    f"Collection '{collection_name}' not found. Available: {sorted(self._collection_names)}"
+                )
         
-        return self._local.database[collection_name]
+        return database[collection_name]
+    
+    def _refresh_collection_names(self):
+        """Reload the cached set of collection names from the database"""
+        self._collection_names = frozenset(self._database.list_collection_names())
 
     @retry_on_connection_error()
     def get_departments(self) -> List[str]:
@@ -167,14 +245,12 @@ class MongoDBService:
             total_count = collection.count_documents(query)
             logger.info(f"Total matching documents: {total_count}")
             
-            # Fetch documents with limit
+            # Stream documents with limit
             cursor = collection.find(query, projection).limit(max_documents)
-            documents = list(cursor)
-            
-            if not documents:
-                return pd.DataFrame()
+            df = cursor_to_dataframe(cursor)
             
-            df = pd.DataFrame(documents)
+            if df.empty:
+                return df
             
             # Convert date columns
             for col in ['announce_date', 'transaction_date', 'contract_date']:
@@ -192,73 +268,117 @@ class MongoDBService:
             logger.error(f"Error fetching projects: {e}")
             raise
     
+    @staticmethod
+    def _department_summary_stages(view_by: str, limit: Optional[int] = None) -> List[Dict]:
+        """Aggregation stages rolling department_distribution up to departments"""
+        stages = [
+            {"$match": {"_id": {"$ne": "totals"}}},
+            {"$group": {
+                "_id": "$_id.dept",
+                "count": {"$sum": "$count"},
+                "total_value": {"$sum": "$total_value"},
+                "count_percentage": {"$sum": "$count_percentage"},
+                "value_percentage": {"$sum": "$value_percentage"},
+                "unique_companies": {"$max": "$unique_companies"}
+            }},
+            {"$project": {
+                "department": "$_id",
+                "count": 1,
+                "total_value": 1,
+                "count_percentage": 1,
+                "value_percentage": 1,
+                "unique_companies": 1,
+                "total_value_millions": {"$divide": ["$total_value", 1000000]}
+            }},
+            {"$sort": {view_by: -1}}
+        ]
+        
+        if limit:
+            stages.append({"$limit": limit})
+        
+        return stages
+    
     @retry_on_connection_error()
     def get_department_summary(self, view_by: str = "count", limit: Optional[int] = None) -> List[Dict]:
         """Get department summary with metrics"""
+        try:
+            collection = self.get_collection("department_distribution")
+            pipeline = self._department_summary_stages(view_by, limit)
+            return list(collection.aggregate(pipeline))
+            
+        except Exception as e:
+            logger.error(f"Error getting department summary: {e}")
+            raise
+    
+    @retry_on_connection_error()
+    def get_department_overview(self, view_by: str = "count", limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Get the totals document and the department summary in one round-trip
+        
+        Args:
+            view_by (str): Summary field to rank departments by
+            limit (Optional[int]): Maximum number of departments
+            
+        Returns:
+            Dict[str, Any]: 'totals' (document or None) and 'departments' (list)
+        """
         try:
             collection = self.get_collection("department_distribution")
             
             pipeline = [
-                {"$match": {"_id": {"$ne": "totals"}}},
-                {"$group": {
-                    "_id": "$_id.dept",
-                    "count": {"$sum": "$count"},
-                    "total_value": {"$sum": "$total_value"},
-                    "count_percentage": {"$sum": "$count_percentage"},
-                    "value_percentage": {"$sum": "$value_percentage"},
-                    "unique_companies": {"$max": "$unique_companies"}
-                }},
-                {"$project": {
-                    "department": "$_id",
-                    "count": 1,
-                    "total_value": 1,
-                    "count_percentage": 1,
-                    "value_percentage": 1,
-                    "unique_companies": 1,
-                    "total_value_millions": {"$divide": ["$total_value", 1000000]}
-                }},
-                {"$sort": {view_by: -1}}
+                {"$facet": {
+                    "totals": [{"$match": {"_id": "totals"}}],
+                    "departments": self._department_summary_stages(view_by, limit)
+                }}
             ]
             
-            if limit:
-                pipeline.append({"$limit": limit})
-            
-            return list(collection.aggregate(pipeline))
+            result = next(collection.aggregate(pipeline), {})
+            totals = result.get("totals") or [None]
+            return {
+                "totals": totals[0],
+                "departments": result.get("departments", [])
+            }
             
         except Exception as e:
-            logger.error(f"Error getting department summary: {e}")
+            logger.error(f"Error getting department overview: {e}")
             raise
     
+    @staticmethod
+    def _subdepartment_stages(match: Dict[str, Any]) -> List[Dict]:
+        """Aggregation stages for sub-department rows with in-department shares"""
+        return [
+            {"$match": {**match, "_id": {"$ne": "totals"}}},
+            {"$group": {
+                "_id": "$_id.dept",
+                "documents": {"$push": "$$ROOT"},
+                "dept_total_count": {"$sum": "$count"},
+                "dept_total_value": {"$sum": "$total_value"}
+            }},
+            {"$unwind": "$documents"},
+            {"$project": {
+                "department": "$_id",
+                "subdepartment": "$documents._id.subdept",
+                "count": "$documents.count",
+                "total_value": "$documents.total_value",
+                "unique_companies": "$documents.unique_companies",
+                "total_value_millions": {"$divide": ["$documents.total_value", 1000000]},
+                "count_percentage": {
+                    "$multiply": [{"$divide": ["$documents.count", "$dept_total_count"]}, 100]
+                },
+                "value_percentage": {
+                    "$multiply": [{"$divide": ["$documents.total_value", "$dept_total_value"]}, 100]
+                }
+            }},
+            {"$sort": {"count": -1}}
+        ]
+    
     @retry_on_connection_error()
     def get_subdepartment_data(self, department: str, limit: Optional[int] = None) -> List[Dict]:
         """Get sub-department data for a department"""
         try:
             collection = self.get_collection("department_distribution")
             
-            pipeline = [
-                {"$match": {"_id.dept": department, "_id": {"$ne": "totals"}}},
-                {"$group": {
-                    "_id": None,
-                    "documents": {"$push": "$$ROOT"},
-                    "dept_total_count": {"$sum": "$count"},
-                    "dept_total_value": {"$sum": "$total_value"}
-                }},
-                {"$unwind": "$documents"},
-                {"$project": {
-                    "subdepartment": "$documents._id.subdept",
-                    "count": "$documents.count",
-                    "total_value": "$documents.total_value",
-                    "unique_companies": "$documents.unique_companies",
-                    "total_value_millions": {"$divide": ["$documents.total_value", 1000000]},
-                    "count_percentage": {
-                        "$multiply": [{"$divide": ["$documents.count", "$dept_total_count"]}, 100]
-                    },
-                    "value_percentage": {
-                        "$multiply": [{"$divide": ["$documents.total_value", "$dept_total_value"]}, 100]
-                    }
-                }},
-                {"$sort": {"count": -1}}
-            ]
+            pipeline = self._subdepartment_stages({"_id.dept": department})
             
             if limit:
                 pipeline.append({"$limit": limit})
@@ -268,11 +388,39 @@ class MongoDBService:
         except Exception as e:
             logger.error(f"Error getting subdepartment data: {e}")
             raise
+    
+    @retry_on_connection_error()
+    def get_all_subdepartment_data(self) -> Dict[str, List[Dict]]:
+        """
+        Get sub-department data for every department in one round-trip
+        
+        Returns:
+            Dict[str, List[Dict]]: Sub-department rows (largest count first) keyed by department
+        """
+        try:
+            collection = self.get_collection("department_distribution")
+            
+            subdept_data: Dict[str, List[Dict]] = {}
+            for row in collection.aggregate(self._subdepartment_stages({})):
+                subdept_data.setdefault(row["department"], []).append(row)
+            return subdept_data
+            
+        except Exception as e:
+            logger.error(f"Error getting subdepartment data for all departments: {e}")
+            raise
 
     def __enter__(self):
         self.ensure_connection()
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.disconnect()
-        return False
\ No newline at end of file
+        # Sockets return to the shared pool after each operation, so there is
+        # nothing to release here; use disconnect() to close the pool itself
+        return False
+
+@st.cache_resource(show_spinner=False)
+def get_mongo_service() -> MongoDBService:
+    """Connected MongoDBService shared across Streamlit reruns and sessions"""
+    service = MongoDBService()
+    service.ensure_connection()
+    return service
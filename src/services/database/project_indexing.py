@@ -0,0 +1,79 @@
+# src/services/database/project_indexing.py
+
+import logging
+from typing import List
+from pymongo import MongoClient, ASCENDING
+from pymongo.database import Database
+
+logger = logging.getLogger(__name__)
+
+class ProjectIndexingService:
+    """Service for creating the indexes used by project search queries"""
+
+    # Equality fields lead and range fields follow, so the filter queries
+    # (department/sub-department equality, transaction_date and
+    # sum_price_agree ranges) can be answered with bounded index scans
+    PROJECT_INDEXES = [
+        [("transaction_date", ASCENDING), ("sum_price_agree", ASCENDING)],
+        [("dept_name", ASCENDING), ("dept_sub_name", ASCENDING), ("transaction_date", ASCENDING)],
+        [("project_id", ASCENDING)]
+    ]
+
+    def __init__(self, db: Database):
+        self.db = db
+        self.projects_collection = "projects"
+
+    def ensure_indexes(self) -> List[str]:
+        """
+        Create the project search indexes (existing indexes are left as they are)
+
+        Returns:
+            List[str]: Names of the ensured indexes
+        """
+        try:
+            collection = self.db[self.projects_collection]
+            names = [collection.create_index(keys) for keys in self.PROJECT_INDEXES]
+            logger.info(f"Project indexes ensured: {', '.join(names)}")
+            return names
+
+        except Exception as e:
+            logger.error(f"Error creating project indexes: {e}")
+            raise
+
+def main():
+    """Main function for creating the project search indexes"""
+    import os
+    from dotenv import load_dotenv
+
+    # Configure logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    try:
+        # Load environment variables
+        load_dotenv()
+        mongo_uri = os.getenv('MONGO_URI')
+        if not mongo_uri:
+            raise ValueError("MONGO_URI environment variable not set")
+
+        db_name = os.getenv('MONGO_DB', 'projects')
+
+        # Connect to MongoDB
+        client = MongoClient(mongo_uri)
+        db = client[db_name]
+
+        # Create the indexes
+        ProjectIndexingService(db).ensure_indexes()
+
+    except Exception as e:
+        logger.error(f"Error in project indexing process: {e}")
+        raise
+    finally:
+        if 'client' in locals():
+            client.close()
+            logger.info("MongoDB connection closed")
+
+if __name__ == "__main__":
+    main()
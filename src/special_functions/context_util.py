@@ -32,6 +32,7 @@ def show_context_info():
             if st.button("🔄 Reset Context", key="reset_context_button"):
                 st.session_state.context_collections = []
                 st.session_state.context_df = None
+                st.session_state.pop('context_ids', None)
                 st.rerun()
     else:
         st.info("No context data loaded. Use the Context Manager to add collections for analysis.")
\ No newline at end of file
@@ -4,8 +4,10 @@ import pandas as pd
 from typing import Optional, Dict, Any, List
 import streamlit as st
 import logging
+import hashlib
+import json
 from services.cache.cache_manager import CacheManager
-from services.database.mongodb import MongoDBService
+from services.database.mongodb import get_mongo_service
 
 logger = logging.getLogger(__name__)
 
@@ -14,7 +16,7 @@ class DataState:
     
     def __init__(self):
         self.cache = CacheManager()
-        self.db = MongoDBService()
+        self.db = get_mongo_service()
     
     def get_filtered_data(
         self,
@@ -33,7 +35,7 @@ class DataState:
         """
         try:
             # Generate cache key from filters
-            cache_key = f"filtered_data_{hash(str(filters))}"
+            cache_key = f"filtered_data_{self._filters_digest(filters)}"
             
             # Check cache first
             if not force_refresh:
@@ -127,6 +129,20 @@ class DataState:
         except Exception as e:
             logger.error(f"Error clearing cache: {e}")
     
+    @staticmethod
+    def _filters_digest(filters: Dict[str, Any]) -> str:
+        """
+        Stable digest of a filters dict for cache keys
+        
+        Keys are sorted and dates serialized as ISO strings, so equal filters
+        map to the same cache entry regardless of dict order, and the key
+        survives process restarts (unlike the salted built-in hash()).
+        """
+        canonical = json.dumps(filters, sort_keys=True, default=lambda value: (
+            value.isoformat() if hasattr(value, 'isoformat') else str(value)
+        ))
+        return hashlib.md5(canonical.encode('utf-8')).hexdigest()
+    
     @staticmethod
     def _build_query(filters: Dict[str, Any]) -> Dict[str, Any]:
         """Build MongoDB query from filters"""
@@ -1,8 +1,8 @@
 # src/state/filters.py
 
 from dataclasses import dataclass
-from datetime import date, datetime
-from typing import Dict, Any, Optional
+from datetime import date, datetime, time, timezone
+from typing import Dict, Any, Optional, Tuple
 import streamlit as st
 import logging
 
@@ -26,6 +26,49 @@ class FilterManager:
         """Get default filter values"""
         return FilterState()
     
+    @staticmethod
+    def date_bounds(date_start: date, date_end: date) -> Tuple[datetime, datetime]:
+        """
+        UTC datetime bounds covering a date range (start of first day to end of last day)
+        
+        Args:
+            date_start (date): First day of the range
+            date_end (date): Last day of the range
+            
+        Returns:
+            Tuple[datetime, datetime]: Inclusive lower and upper bounds
+        """
+        return (
+            datetime.combine(date_start, time.min, tzinfo=timezone.utc),
+            datetime.combine(date_end, time.max, tzinfo=timezone.utc)
+        )
+    
+    @staticmethod
+    def with_date_bounds(filters: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Store the query bounds for the date range in the filters dict
+        
+        Computed once when filters are set, so query builders can use
+        `date_start_dt`/`date_end_dt` directly instead of rebuilding them.
+        """
+        if filters.get('date_start') and filters.get('date_end'):
+            filters['date_start_dt'], filters['date_end_dt'] = FilterManager.date_bounds(
+                filters['date_start'], filters['date_end']
+            )
+        else:
+            filters.pop('date_start_dt', None)
+            filters.pop('date_end_dt', None)
+        return filters
+    
+    @staticmethod
+    def get_date_bounds(filters: Dict[str, Any]) -> Optional[Tuple[datetime, datetime]]:
+        """Precomputed date bounds from filters, computed here only if missing"""
+        if filters.get('date_start_dt') and filters.get('date_end_dt'):
+            return filters['date_start_dt'], filters['date_end_dt']
+        if filters.get('date_start') and filters.get('date_end'):
+            return FilterManager.date_bounds(filters['date_start'], filters['date_end'])
+        return None
+    
     @staticmethod
     def validate_filters(filters: Dict[str, Any]) -> bool:
         """
@@ -84,10 +127,11 @@ class FilterManager:
                 query['project_type_name'] = filters['project_type_name']
             
             # Date range filter
-            if filters.get('date_start') and filters.get('date_end'):
+            date_bounds = FilterManager.get_date_bounds(filters)
+            if date_bounds:
                 query['transaction_date'] = {
-                    "$gte": datetime.combine(filters['date_start'], datetime.min.time()),
-                    "$lte": datetime.combine(filters['date_end'], datetime.max.time())
+                    "$gte": date_bounds[0],
+                    "$lte": date_bounds[1]
                 }
             
             # Price range filter
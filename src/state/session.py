@@ -4,6 +4,7 @@ import streamlit as st
 from datetime import datetime, date
 from typing import Dict, Any, Optional, List
 import logging
+from state.filters import FilterManager
 
 logger = logging.getLogger(__name__)
 
@@ -19,7 +20,7 @@ class SessionState:
             st.session_state.previous_page = None
             
             # Filter state
-            st.session_state.filters = {
+            st.session_state.filters = FilterManager.with_date_bounds({
                 'dept_name': '',
                 'dept_sub_name': '',
                 'purchase_method_name': '',  # Added
@@ -28,7 +29,7 @@ class SessionState:
                 'date_end': datetime(2023, 12, 31).date(),
                 'price_start': 0.0,
                 'price_end': 200.0
-            }
+            })
             
             # Rest of initialization remains the same
             st.session_state.filtered_df = None
@@ -64,6 +65,7 @@ class SessionState:
     def update_filters(new_filters: Dict[str, Any]):
         """Update filter values and mark as applied"""
         st.session_state.filters.update(new_filters)
+        FilterManager.with_date_bounds(st.session_state.filters)
         st.session_state.filters_applied = True
         st.session_state.filtered_df = None  # Clear cached data
         logger.info("Filters updated")
@@ -71,7 +73,7 @@ class SessionState:
     @staticmethod
     def clear_filters():
         """Reset filters to default values"""
-        st.session_state.filters = {
+        st.session_state.filters = FilterManager.with_date_bounds({
             'dept_name': '',
             'dept_sub_name': '',
             'purchase_method_name': '',  # Added
@@ -80,7 +82,7 @@ class SessionState:
             'date_end': datetime(2023, 12, 31).date(),
             'price_start': 0.0,
             'price_end': 200.0
-        }
+        })
         st.session_state.filters_applied = False
         st.session_state.filtered_df = None
         logger.info("Filters cleared")